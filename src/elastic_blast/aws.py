@@ -28,18 +28,19 @@ import logging
 import re
 import time
 import os
-from collections import defaultdict
-from functools import wraps
+import threading
+from collections import defaultdict, Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import wraps, cached_property
 import json
 import inspect
-from tempfile import NamedTemporaryFile
 from timeit import default_timer as timer
 import uuid
 
 from pprint import pformat
 from pathlib import Path
 
-from typing import Any, Dict, List, Tuple, Optional
+from typing import Any, Dict, List, Set, Tuple, Optional
 
 import boto3  # type: ignore
 from botocore.exceptions import ClientError, NoCredentialsError, ParamValidationError, WaiterError # type: ignore
@@ -51,11 +52,13 @@ from copy import deepcopy
 from .util import convert_labels_to_aws_tags, convert_disk_size_to_gb
 from .util import convert_memory_to_mb, UserReportError
 from .util import ElbSupportedPrograms, get_usage_reporting, sanitize_aws_batch_job_name
-from .util import get_resubmission_error_msg
+from .util import get_resubmission_error_msg, buffered_logging
 from .constants import BLASTDB_ERROR, CLUSTER_ERROR, ELB_QUERY_LENGTH, PERMISSIONS_ERROR
 from .constants import ELB_QUERY_BATCH_DIR, ELB_METADATA_DIR
 from .constants import ELB_DOCKER_IMAGE_AWS, INPUT_ERROR, ELB_QS_DOCKER_IMAGE_AWS
 from .constants import DEPENDENCY_ERROR, TIMEOUT_ERROR
+from .constants import ELB_AWS_JOB_SUBMISSION_THREADS, ELB_AWS_JOB_SUBMISSION_RATE
+from .constants import ELB_AWS_STATUS_CHECK_THREADS, ELB_AWS_LIST_JOBS_PAGE_SIZE
 from .constants import ELB_AWS_JOB_IDS, ELB_S3_PREFIX, ELB_GCS_PREFIX
 from .constants import ELB_DFLT_NUM_BATCHES_FOR_TESTING, ELB_UNKNOWN_NUMBER_OF_QUERY_SPLITS
 from .constants import ElbStatus, ELB_CJS_DOCKER_IMAGE_AWS
@@ -73,10 +76,33 @@ from .elasticblast import ElasticBlast
 
 
 CF_TEMPLATE = os.path.join(os.path.dirname(__file__), 'templates', 'elastic-blast-cf.yaml')
+# read once, the template does not change while the application runs
+CF_TEMPLATE_BODY = Path(CF_TEMPLATE).read_text()
 # the order of job states reflects state transitions and is important for
-# ElasticBlastAws.get_job_ids method
+# ElasticBlastAws._check_status_extended method
 AWS_BATCH_JOB_STATES = ['SUBMITTED', 'PENDING', 'RUNNABLE', 'STARTING', 'RUNNING', 'SUCCEEDED', 'FAILED']
+AWS_BATCH_TERMINAL_JOB_STATES = frozenset({'SUCCEEDED', 'FAILED'})
+# AWS Batch job states reported as pending by elastic-blast status
+AWS_BATCH_PENDING_JOB_STATES = frozenset({'SUBMITTED', 'PENDING', 'RUNNABLE', 'STARTING'})
+# Order of job states and job fields with their labels in the verbose
+# status report, see ElasticBlastAws._check_status_extended
+STATUS_REPORT_ORDER = ('pending', 'running', 'succeeded', 'failed')
+STATUS_REPORT_JOB_FIELDS = tuple((k, k[0].upper()+k[1:]) for k in ('jobArn', 'jobName', 'statusReason'))
+STATUS_REPORT_CONTAINER_FIELDS = tuple((k, 'Container'+k[0].upper()+k[1:]) for k in ('exitCode', 'reason'))
+
+# How long, in seconds, job ids loaded from S3 are considered current by
+# ElasticBlastAws._check_status before the metadata file is read again
+JOB_IDS_CACHE_TTL = 60
+
 SECONDS2SLEEP = 10
+# EC2 instance types with locally attached NVMe SSDs
+SSD_INSTANCE_TYPE_RE = re.compile(r'^[cmr]5a?dn?\.\d{0,2}x?large$')
+# CloudFormation waiters probe stack status every 10s for up to an hour,
+# boto3 default is every 30s
+CF_WAITER_CONFIG = {'Delay': 10, 'MaxAttempts': 360}
+
+# CloudFormation stack event statuses, see ElasticBlastAws._get_cloudformation_errors
+CF_RESOURCE_FAILED_STATES = frozenset({'CREATE_FAILED', 'DELETE_FAILED'})
 
 def handle_aws_error(f):
     """ Defines decorator to consistently handle exceptions stemming from AWS API calls. """
@@ -96,6 +122,33 @@ def handle_aws_error(f):
     return wrapper
 
 
+class RateLimiter:
+    """ Token bucket that limits the rate of AWS API calls made from several
+    threads, so that we stay within AWS service quotas """
+
+    def __init__(self, rate: float):
+        """ Parameters:
+                rate - maximum number of calls per second
+        """
+        self.rate = rate
+        self.tokens = rate
+        self.last = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """ Block until a call is allowed """
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.rate, self.tokens + (now - self.last) * self.rate)
+                self.last = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                secs2wait = (1 - self.tokens) / self.rate
+            time.sleep(secs2wait)
+
+
 def check_cluster(cfg: ElasticBlastConfig) -> bool:
     """ Check that cluster described in configuration is running
         Parameters:
@@ -106,10 +159,10 @@ def check_cluster(cfg: ElasticBlastConfig) -> bool:
     if cfg.cluster.dry_run:
         return False
     boto_cfg = create_aws_config(cfg.aws.region)
-    cf = boto3.resource('cloudformation', config=boto_cfg)
+    cf = boto3.client('cloudformation', config=boto_cfg)
     try:
-        cf_stack = cf.Stack(cfg.cluster.name)
-        status = cf_stack.stack_status  # Will throw exception if error/non-existant
+        # Will throw exception if error/non-existant
+        cf.describe_stacks(StackName=cfg.cluster.name)
         return True
     except ClientError:
         return False
@@ -161,6 +214,10 @@ class ElasticBlastAws(ElasticBlast):
             create - if cluster does not exist, create it. Default: False
         """
         super().__init__(cfg, create, cleanup_stack)
+        # ids and state counts of AWS Batch jobs that reached a terminal
+        # state, these jobs are not described again, see _check_status
+        self.finished_job_ids: Set[str] = set()
+        self.finished_job_counts: Counter = Counter()
         self._init(cfg, create)
 
     @handle_aws_error
@@ -172,9 +229,6 @@ class ElasticBlastAws(ElasticBlast):
 
         self.cf = boto3.resource('cloudformation', config=self.boto_cfg)
         self.batch = boto3.client('batch', config=self.boto_cfg)
-        self.s3 = boto3.resource('s3', config=self.boto_cfg)
-        self.iam = boto3.resource('iam', config=self.boto_cfg)
-        self.ec2 = boto3.resource('ec2', config=self.boto_cfg)
 
         # Per EB-1554, to prevent role names from getting longer than 64 characters
         MAX_USERNAME_LENGTH=38 
@@ -185,6 +239,8 @@ class ElasticBlastAws(ElasticBlast):
         self._provide_subnets()
         self.cf_stack = None
         self.job_ids = JobIds()
+        # time.monotonic() of the last read of job ids from S3
+        self.job_ids_loaded_at: Optional[float] = None
 
         initialized = True
 
@@ -222,7 +278,7 @@ class ElasticBlastAws(ElasticBlast):
             disk_type = self.cfg.cluster.disk_type
             instance_type = self.cfg.cluster.machine_type
             # FIXME: This is a shortcut, should be implemented in get_machine_properties
-            if re.match(r'[cmr]5a?dn?\.\d{0,2}x?large', instance_type) or instance_type.startswith('x1'):
+            if SSD_INSTANCE_TYPE_RE.match(instance_type) or instance_type.startswith('x1'):
                 use_ssd = True
                 # Shrink the default EBS root disk since EC2 instances will use locally attached SSDs
                 disk_type = 'gp3'
@@ -287,8 +343,16 @@ class ElasticBlastAws(ElasticBlast):
                 params.append({'ParameterKey': 'ProvisionedIops', 
                                'ParameterValue': str(self.cfg.cluster.iops)})
 
-            instance_role = self._get_instance_role()
-            batch_service_role = self._get_batch_service_role()
+            # IAM lookups are independent of each other, run them concurrently.
+            # Create the IAM resource here: cached_property is not thread
+            # safe and neither is creating boto3 resources from the default
+            # session.
+            _ = self.iam.meta.client
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                instance_role_lookup = executor.submit(self._get_instance_role)
+                batch_service_role_lookup = executor.submit(self._get_batch_service_role)
+                instance_role = instance_role_lookup.result()
+                batch_service_role = batch_service_role_lookup.result()
             job_role = self._get_job_role()
             spot_fleet_role = self._get_spot_fleet_role()
 
@@ -321,10 +385,12 @@ class ElasticBlastAws(ElasticBlast):
                 # this is needed if cloudformation template creates roles
                 capabilities = ['CAPABILITY_NAMED_IAM']
 
-            logging.debug(f'Setting AWS tags: {pformat(tags)}')
-            logging.debug(f'Setting AWS CloudFormation parameters: {pformat(params)}')
+            # pformat runs eagerly, so only if the messages will be logged
+            if logging.getLogger().isEnabledFor(logging.DEBUG):
+                logging.debug(f'Setting AWS tags: {pformat(tags)}')
+                logging.debug(f'Setting AWS CloudFormation parameters: {pformat(params)}')
             logging.debug(f'Creating CloudFormation stack {self.stack_name} from {CF_TEMPLATE}')
-            template_body = Path(CF_TEMPLATE).read_text()
+            template_body = CF_TEMPLATE_BODY
             creation_failure_strategy = 'DELETE'
             if 'ELB_ROLLBACK_ON_CFN_CREATION_FAILURE' in os.environ:
                 creation_failure_strategy = 'ROLLBACK'
@@ -343,28 +409,29 @@ class ElasticBlastAws(ElasticBlast):
                 waiter = self.cf.meta.client.get_waiter('stack_create_complete')
                 try:
                     # Waiter periodically probes for cloudformation stack
-                    # status with default period of 30s and 120 tries.
+                    # status as set in CF_WAITER_CONFIG.
                     # If it takes over an hour to create a stack, then the code
                     # will exit with an error before the stack is created.
-                    waiter.wait(StackName=self.stack_name)
+                    waiter.wait(StackName=self.stack_name, WaiterConfig=CF_WAITER_CONFIG)
                 except WaiterError as err:
+                    stack_status = self._get_stack_status_after_waiter_error(err)
                     # report cloudformation stack creation timeout
-                    if self.cf_stack.stack_status == 'CREATE_IN_PROGRESS':
+                    if stack_status == 'CREATE_IN_PROGRESS':
                         raise UserReportError(returncode=TIMEOUT_ERROR,
-                                              message='CloudFormation stack creation has timed out')
+                                              message='CloudFormation stack creation has timed out') from err
 
                     # report cloudformation stack creation error,
-                    elif self.cf_stack.stack_status != 'CREATE_COMPLETE':
+                    elif stack_status != 'CREATE_COMPLETE':
                         # report error message
                         message = 'CloudFormation stack creation failed'
-                        stack_messages = self._get_cloudformation_errors()
+                        stack_messages = self._get_cloudformation_errors('CREATE')
                         if stack_messages:
                             message += f' with error message {". ".join(stack_messages)}'
                         else:
                             message += f' for unknown reason.'
                         message += ' Please, run elastic-blast delete to remove CloudFormation stack with errors'
                         raise UserReportError(returncode=DEPENDENCY_ERROR,
-                                              message=message)
+                                              message=message) from err
 
                 status = self.cf_stack.stack_status
                 logging.debug(f'Created AWS CloudFormation stack {self.cf_stack}: status {status}')
@@ -381,17 +448,12 @@ class ElasticBlastAws(ElasticBlast):
         self.compute_env_name = None
         if not self.dry_run and self.cf_stack and \
                self.cf_stack.stack_status == 'CREATE_COMPLETE':
-            for output in self.cf_stack.outputs:
-                if output['OutputKey'] == 'JobQueueName':
-                    self.job_queue_name = output['OutputValue']
-                elif output['OutputKey'] == 'BlastJobDefinitionName':
-                    self.blast_job_definition_name = output['OutputValue']
-                elif output['OutputKey'] == 'QuerySplittingJobDefinitionName':
-                    self.qs_job_definition_name = output['OutputValue']
-                elif output['OutputKey'] == 'JobSubmissionJobDefinitionName':
-                    self.js_job_definition_name = output['OutputValue']
-                elif output['OutputKey'] == 'ComputeEnvName':
-                    self.compute_env_name = output['OutputValue']
+            outputs = {o['OutputKey']: o['OutputValue'] for o in self.cf_stack.outputs}
+            self.job_queue_name = outputs.get('JobQueueName')
+            self.blast_job_definition_name = outputs.get('BlastJobDefinitionName')
+            self.qs_job_definition_name = outputs.get('QuerySplittingJobDefinitionName')
+            self.js_job_definition_name = outputs.get('JobSubmissionJobDefinitionName')
+            self.compute_env_name = outputs.get('ComputeEnvName')
 
             if self.job_queue_name:
                 logging.debug(f'JobQueueName: {self.job_queue_name}')
@@ -418,6 +480,29 @@ class ElasticBlastAws(ElasticBlast):
             else:
                 logging.warning('ComputeEnvName could not be read from CloudFormation stack')
 
+    # S3, IAM, and EC2 are not needed by every command, so their boto3
+    # resources are created on first use
+    @cached_property
+    def s3(self):
+        """ boto3 S3 resource """
+        return boto3.resource('s3', config=self.boto_cfg)
+
+    @cached_property
+    def iam(self):
+        """ boto3 IAM resource """
+        return boto3.resource('iam', config=self.boto_cfg)
+
+    @cached_property
+    def ec2(self):
+        """ boto3 EC2 resource """
+        return boto3.resource('ec2', config=self.boto_cfg)
+
+    @cached_property
+    def job_ids_s3_object(self):
+        """ boto3 S3 object for the job ids metadata file in the results bucket """
+        bucket_name, key = parse_bucket_name_key(f'{self.results_bucket}/{ELB_METADATA_DIR}/{ELB_AWS_JOB_IDS}')
+        return self.s3.Object(bucket_name, key)
+
     def _provide_subnets(self):
         """ Read subnets from config file or if not set try to get them from default VPC """
         if self.dry_run:
@@ -427,28 +512,26 @@ class ElasticBlastAws(ElasticBlast):
             # Try to get subnet from default VPC or VPC set in aws-vpc config parameter
             vpc = self._provide_vpc()
             if vpc:
-                subnet_list = vpc.subnets.all()
+                resp = self.ec2.meta.client.describe_subnets(Filters=[{'Name': 'vpc-id', 'Values': [vpc.id]}])
                 self.vpc_id = vpc.id
-                self.subnets = ','.join(map(lambda x: x.id, subnet_list))
+                self.subnets = ','.join(subnet['SubnetId'] for subnet in resp['Subnets'])
         else:
             # Ensure that VPC is set and that subnets provided belong to it
             subnets = [x.strip() for x in self.cfg.aws.subnet.split(',')]
             # If aws-vpc parameter is set, use this VPC, otherwise use VPC of the
             # first subnet
             logging.debug(f"Subnets are provided: {' ,'.join(subnets)}")
-            vpc = None
+            vpc_ids: Set[str] = set()
             if self.vpc_id:
                 if self.vpc_id.lower() == 'none':
                     return
-                vpc = self.ec2.Vpc(self.vpc_id)
-            for subnet_name in subnets:
-                subnet = self.ec2.Subnet(subnet_name)
-                if not vpc:
-                    vpc = subnet.vpc # if subnet is invalid - will throw an exception botocore.exceptions.ClientError with InvalidSubnetID.NotFound
-                else:
-                    if subnet.vpc != vpc:
-                        raise UserReportError(returncode=INPUT_ERROR, message="Subnets set in aws-subnet parameter belong to different VPCs")
-            self.vpc_id = vpc.id
+                vpc_ids.add(self.vpc_id)
+            # if any subnet is invalid - will throw an exception botocore.exceptions.ClientError with InvalidSubnetID.NotFound
+            resp = self.ec2.meta.client.describe_subnets(SubnetIds=subnets)
+            vpc_ids.update(subnet['VpcId'] for subnet in resp['Subnets'])
+            if len(vpc_ids) > 1:
+                raise UserReportError(returncode=INPUT_ERROR, message="Subnets set in aws-subnet parameter belong to different VPCs")
+            self.vpc_id = vpc_ids.pop()
             self.subnets = ','.join(subnets)
         logging.debug(f"Using VPC {self.vpc_id}, subnet(s) {self.subnets}")
 
@@ -483,13 +566,15 @@ class ElasticBlastAws(ElasticBlast):
         # if it is
         # instance profile and role, both named ecsInstanceRole must exist
         DFLT_INSTANCE_ROLE_NAME = 'ecsInstanceRole'
-        instance_profile = self.iam.InstanceProfile(DFLT_INSTANCE_ROLE_NAME)
+        # boto3 clients, unlike resources, are safe to use from several threads
+        iam = self.iam.meta.client
         try:
-            role_names = [i.name for i in instance_profile.roles]
+            instance_profile = iam.get_instance_profile(InstanceProfileName=DFLT_INSTANCE_ROLE_NAME)['InstanceProfile']
+            role_names = [i['RoleName'] for i in instance_profile['Roles']]
             if DFLT_INSTANCE_ROLE_NAME in role_names:
                 logging.debug(f'Using {DFLT_INSTANCE_ROLE_NAME} present in the account')
                 return DFLT_INSTANCE_ROLE_NAME
-        except self.iam.meta.client.exceptions.NoSuchEntityException:
+        except iam.exceptions.NoSuchEntityException:
             # an exception means that ecsInstanceRole is not defined in the
             # account
             pass
@@ -514,14 +599,14 @@ class ElasticBlastAws(ElasticBlast):
         # if it is
         # instance profile and role, both named ecsInstanceRole must exist
         DFLT_BATCH_SERVICE_ROLE_NAME = 'AWSBatchServiceRole'
-        role = self.iam.Role(DFLT_BATCH_SERVICE_ROLE_NAME)
+        # boto3 clients, unlike resources, are safe to use from several threads
+        iam = self.iam.meta.client
         try:
-            # Accessing role.arn will trigger an exception if the role is
-            # not defined
-            _ = role.arn
-            logging.debug(f'Using {role.name} present in the account')
-            return role.arn
-        except self.iam.meta.client.exceptions.NoSuchEntityException:
+            # GetRole will trigger an exception if the role is not defined
+            role = iam.get_role(RoleName=DFLT_BATCH_SERVICE_ROLE_NAME)['Role']
+            logging.debug(f'Using {role["RoleName"]} present in the account')
+            return role['Arn']
+        except iam.exceptions.NoSuchEntityException:
             # an exception means that the role is not defined in the account
             pass
 
@@ -579,27 +664,40 @@ class ElasticBlastAws(ElasticBlast):
             
                 waiter = self.cf.meta.client.get_waiter('stack_delete_complete')
                 try:
-                    waiter.wait(StackName=self.stack_name)
-                except WaiterError:
+                    waiter.wait(StackName=self.stack_name, WaiterConfig=CF_WAITER_CONFIG)
+                except WaiterError as err:
+                    stack_status = self._get_stack_status_after_waiter_error(err)
                     # report cloudformation stack deletion timeout
-                    if self.cf_stack.stack_status == 'DELETE_IN_PROGRESS':
+                    if stack_status == 'DELETE_IN_PROGRESS':
                         raise UserReportError(returncode=TIMEOUT_ERROR,
-                                            message='CloudFormation stack deletion has timed out')
+                                            message='CloudFormation stack deletion has timed out') from err
 
                     # report cloudformation stack deletion error
-                    elif self.cf_stack.stack_status != 'DELETE_COMPLETE':
+                    elif stack_status != 'DELETE_COMPLETE':
                         message = 'CloudFormation stack deletion failed'
-                        stack_messages = self._get_cloudformation_errors()
+                        stack_messages = self._get_cloudformation_errors('DELETE')
                         if stack_messages:
                             message += f' with errors {". ".join(stack_messages)}'
                         else:
                             message += ' for unknown reason'
                         raise UserReportError(returncode=DEPENDENCY_ERROR,
-                                            message=message)
+                                            message=message) from err
                 logging.debug(f'Deleted AWS CloudFormation stack {self.stack_name}')
         else:
             logging.debug(f'dry-run: would have deleted {self.stack_name}')
 
+    def _get_stack_status_after_waiter_error(self, err: WaiterError) -> str:
+        """Return CloudFormation stack status after a stack waiter failed.
+        The waiter's last DescribeStacks response is used when it has the
+        stack, so that no extra API call is made, and a status cached in
+        self.cf_stack before the waiter started is not reported."""
+        stacks = (err.last_response or {}).get('Stacks')
+        if stacks:
+            return stacks[0]['StackStatus']
+        # cloudformation stack must be initialized
+        assert self.cf_stack
+        return self.cf_stack.stack_status
+
     def _get_blastdb_info(self) -> Tuple[str, str, str]:
         """Returns a tuple of BLAST database basename, path (if applicable), and label
         suitable for job name. Gets user provided database from configuration.
@@ -618,8 +716,11 @@ class ElasticBlastAws(ElasticBlast):
             bname, key = parse_bucket_name_key(db)
             if not self.dry_run:
                 try:
-                    bucket = self.s3.Bucket(bname)
-                    if len(list(bucket.objects.filter(Prefix=key, Delimiter='/'))) == 0:
+                    # A single BLAST database file (db.*) is enough to tell
+                    # the database exists
+                    resp = self.s3.meta.client.list_objects_v2(Bucket=bname, Prefix=key + '.',
+                                                               MaxKeys=1)
+                    if not resp.get('Contents'):
                         raise RuntimeError
                 except:
                     raise UserReportError(returncode=BLASTDB_ERROR,
@@ -666,8 +767,9 @@ class ElasticBlastAws(ElasticBlast):
         parameters = {'input': query_files[0],
                       'batchlen': str(self.cfg.blast.batch_len),
                       'output': self.results_bucket}
-        logging.debug(f'Query splitting job definition container overrides {overrides}')
-        logging.debug(f"Query splitting job definition parameters {parameters}")
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug(f'Query splitting job definition container overrides {overrides}')
+            logging.debug(f'Query splitting job definition parameters {parameters}')
         jname = f'elasticblast-{self.owner}-{self.cfg.cluster.results.md5}-query-split'
         if not self.dry_run:
             logging.debug(f"Launching query splitting job named {jname}")
@@ -761,8 +863,9 @@ class ElasticBlastAws(ElasticBlast):
             ovr_env.append({'name': 'BLAST_USAGE_REPORT',
                                              'value': os.environ['BLAST_USAGE_REPORT']})
 
-        logging.debug(f'Job submission in the cloud parameters: {parameters}')
-        logging.debug(f'Job submission in the cloud overrides: {overrides}')
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug(f'Job submission in the cloud parameters: {parameters}')
+            logging.debug(f'Job submission in the cloud overrides: {overrides}')
         jname = f'elasticblast-{self.owner}-{self.cfg.cluster.results.md5}-job-submissions'
         if not self.dry_run:
             logging.debug(f'Submit-jobs job definition name: {self.js_job_definition_name}')
@@ -816,7 +919,8 @@ class ElasticBlastAws(ElasticBlast):
         if no_search:
             parameters['do-search'] = '--no-search'
 
-        logging.debug(f'Job definition container overrides {overrides}')
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug(f'Job definition container overrides {overrides}')
 
         num_parts = ELB_UNKNOWN_NUMBER_OF_QUERY_SPLITS
         if one_stage_cloud_query_split:
@@ -839,38 +943,87 @@ class ElasticBlastAws(ElasticBlast):
             query_batches = query_batches[:nbatches2test]
             logging.debug(f'For testing purposes will only process a subset of query batches: {nbatches2test}')
 
-        start = timer()
-        for i, q in enumerate(query_batches):
-            parameters['query-batch'] = q
-            parameters['split-part'] = str(i)
-            jname = f'elasticblast-{self.owner}-{prog}-batch-{self.db_label}-job-{i}'
-            # add random search id for ElasticBLAST usage reporting
-            # and pass BLAST_USAGE_REPORT environment var to container
+        # add random search id for ElasticBLAST usage reporting
+        # and pass BLAST_USAGE_REPORT environment var to container,
+        # only the batch number differs between jobs
+        if usage_reporting:
+            usage_report_env = [{'name': 'BLAST_ELB_JOB_ID',
+                                 'value': elb_job_id},
+                                {'name': 'BLAST_USAGE_REPORT',
+                                 'value': 'true'}]
+        else:
+            overrides['environment'] = [{'name': 'BLAST_USAGE_REPORT',
+                                         'value': 'false'}]
+
+        # job names differ only by the batch number
+        jname_prefix = f'elasticblast-{self.owner}-{prog}-batch-{self.db_label}-job-'
+        rate_limiter = RateLimiter(ELB_AWS_JOB_SUBMISSION_RATE)
+        # SubmitJob arguments that are the same for all jobs
+        base_submit_job_args: Dict[str, Any] = {
+            "jobQueue": self.job_queue_name,
+            "jobDefinition": self.blast_job_definition_name
+        }
+        if self.job_ids.query_splitting:
+            base_submit_job_args["dependsOn"] = [{'jobId': self.job_ids.query_splitting}]
+
+        def submit_search_job(i: int, q: str) -> str:
+            """ Submit a BLAST search job for query batch q, returns its AWS Batch job id """
+            job_parameters = dict(parameters)
+            job_parameters['query-batch'] = q
+            job_parameters['split-part'] = str(i)
+            jname = jname_prefix + str(i)
+            job_overrides = overrides
             if usage_reporting:
-                overrides['environment'] = [{'name': 'BLAST_ELB_JOB_ID',
-                                             'value': elb_job_id},
-                                            {'name': 'BLAST_USAGE_REPORT',
-                                             'value': 'true'},
-                                            {'name': 'BLAST_ELB_BATCH_NUM',
-                                             'value': str(i)}]
-            else:
-                overrides['environment'] = [{'name': 'BLAST_USAGE_REPORT',
-                                             'value': 'false'}]
-            if not self.dry_run:
-                submit_job_args = {
-                    "jobQueue": self.job_queue_name,
-                    "jobDefinition": self.blast_job_definition_name,
-                    "jobName": jname,
-                    "parameters": parameters,
-                    "containerOverrides": overrides
-                }
-                if self.job_ids.query_splitting:
-                    submit_job_args["dependsOn"] = [{'jobId': self.job_ids.query_splitting}]
-                job = self.batch.submit_job(**submit_job_args)
-                self.job_ids.search.append(job['jobId'])
-                logging.debug(f"Job definition parameters for job {job['jobId']} {parameters}")
-                logging.info(f"Submitted AWS Batch job {job['jobId']} with query {q}")
-            else:
+                job_overrides = dict(overrides)
+                job_overrides['environment'] = usage_report_env + \
+                    [{'name': 'BLAST_ELB_BATCH_NUM', 'value': str(i)}]
+            submit_job_args = dict(base_submit_job_args,
+                                   jobName=jname,
+                                   parameters=job_parameters,
+                                   containerOverrides=job_overrides)
+            rate_limiter.acquire()
+            job = self.batch.submit_job(**submit_job_args)
+            # the parameters are only formatted if DEBUG is enabled
+            if logging.getLogger().isEnabledFor(logging.DEBUG):
+                logging.debug(f"Submitted AWS Batch job {job['jobId']} with query {q}, job definition parameters {job_parameters}")
+            return job['jobId']
+
+        # report progress periodically rather than for every job
+        LOG_PROGRESS_EVERY = 100
+        start = timer()
+        if not self.dry_run:
+            futures: List[Future] = []
+            try:
+                # boto3 clients are thread safe, SubmitJob calls are I/O bound
+                with buffered_logging(), \
+                        ThreadPoolExecutor(max_workers=ELB_AWS_JOB_SUBMISSION_THREADS) as executor:
+                    futures = [executor.submit(submit_search_job, i, q)
+                               for i, q in enumerate(query_batches)]
+                    try:
+                        # job ids are recorded in the order of query batches
+                        for num_submitted, future in enumerate(futures, start=1):
+                            self.job_ids.search.append(future.result())
+                            if num_submitted % LOG_PROGRESS_EVERY == 0:
+                                logging.info(f'Submitted {num_submitted} of {len(query_batches)} AWS Batch jobs')
+                    except BaseException:
+                        # do not submit the remaining jobs, the executor still
+                        # waits for submissions that already started
+                        for future in futures:
+                            future.cancel()
+                        raise
+            except BaseException:
+                # save ids of the jobs that were submitted, so that they can
+                # be tracked and deleted
+                self.job_ids.search = [future.result() for future in futures
+                                       if future.done() and not future.cancelled()
+                                       and future.exception() is None]
+                if self.job_ids.search:
+                    self.upload_job_ids()
+                raise
+            logging.info(f'Submitted {len(query_batches)} AWS Batch jobs to job queue {self.job_queue_name}')
+        else:
+            for i, q in enumerate(query_batches):
+                jname = jname_prefix + str(i)
                 logging.debug(f'dry-run: would have submitted {jname} with query {q}')
         end = timer()
         logging.debug(f'RUNTIME submit-jobs {end-start} seconds')
@@ -884,25 +1037,24 @@ class ElasticBlastAws(ElasticBlast):
 
     def get_job_ids(self) -> List[str]:
         """Get a list of batch job ids"""
-        # we can only query for job ids by jobs states which can change
-        # between calls, so order in which job states are processed matters
-        ids = defaultdict(int)
         logging.debug(f'Retrieving job IDs from job queue {self.job_queue_name}')
-        for status in AWS_BATCH_JOB_STATES:
-            batch_of_jobs = self.batch.list_jobs(jobQueue=self.job_queue_name,
-                                             jobStatus=status)
-            for j in batch_of_jobs['jobSummaryList']:
-                ids[j['jobId']] = 1
+        paginator = self.batch.get_paginator('list_jobs')
+
+        def list_job_ids(status: str) -> List[str]:
+            """Get ids of jobs in the given AWS Batch job state"""
+            pages = paginator.paginate(jobQueue=self.job_queue_name, jobStatus=status,
+                                       PaginationConfig={'PageSize': ELB_AWS_LIST_JOBS_PAGE_SIZE})
+            return list(pages.search('jobSummaryList[].jobId'))
 
-            while 'nextToken' in batch_of_jobs:
-                batch_of_jobs = self.batch.list_jobs(jobQueue=self.job_queue_name,
-                                                     jobStatus=status,
-                                                     nextToken=batch_of_jobs['nextToken'])
-                for j in batch_of_jobs['jobSummaryList']:
-                    ids[j['jobId']] = 1
+        # job states are queried concurrently, a job that changes state
+        # between calls may be listed under more than one state
+        ids: Set[str] = set()
+        with ThreadPoolExecutor(max_workers=len(AWS_BATCH_JOB_STATES)) as executor:
+            for job_ids in executor.map(list_job_ids, AWS_BATCH_JOB_STATES):
+                ids.update(job_ids)
 
-        logging.debug(f'Retrieved {len(ids.keys())} job IDs')
-        return list(ids.keys())
+        logging.debug(f'Retrieved {len(ids)} job IDs')
+        return list(ids)
 
 
     def upload_job_ids(self) -> None:
@@ -913,9 +1065,7 @@ class ElasticBlastAws(ElasticBlast):
         current_job_ids.merge(self.job_ids)
         self.job_ids = current_job_ids
 
-        bucket_name, key = parse_bucket_name_key(f'{self.results_bucket}/{ELB_METADATA_DIR}/{ELB_AWS_JOB_IDS}')
-        bucket = self.s3.Bucket(bucket_name)
-        bucket.put_object(Body=self.job_ids.to_json().encode(), Key=key) # type: ignore
+        self.job_ids_s3_object.put(Body=self.job_ids.to_json().encode()) # type: ignore
         logging.debug(f'Uploaded job IDs to {self.results_bucket}/{ELB_METADATA_DIR}/{ELB_AWS_JOB_IDS}')
 
 
@@ -938,6 +1088,9 @@ class ElasticBlastAws(ElasticBlast):
                 counts - job counts for all job states
                 verbose_result - a dictionary with entries: label, detailed info about jobs
         """
+        # Status from results metadata is final, so it is never re-checked
+        if self.cached_status:
+            return self.cached_status, self.cached_counts, {STATUS_MESSAGE_ERROR: self.cached_failure_message}
         try:
             retval = self._status_from_results()
             if retval != ElbStatus.UNKNOWN:
@@ -972,22 +1125,20 @@ class ElasticBlastAws(ElasticBlast):
             in S3 means that list of job ids is empty.
             Post-condition: self.job_ids contains the list of job IDs for this search
         """
-        with NamedTemporaryFile() as tmp:
-            bucket_name, key = parse_bucket_name_key(os.path.join(self.results_bucket, ELB_METADATA_DIR, ELB_AWS_JOB_IDS))
-            bucket = self.s3.Bucket(bucket_name)
-            try:
-                bucket.download_file(key, tmp.name)
-                with open(tmp.name) as f_ids:
-                    new_job_ids = JobIds.from_json(f_ids.read())
-                    self.job_ids.merge(new_job_ids)
-            except ClientError as err:
-                err_code = err.response['Error']['Code']
-                fnx_name = inspect.stack()[0].function
-                if err_code == "404":
-                    logging.debug(f'{fnx_name} failed to retrieve {os.path.join(self.results_bucket, ELB_METADATA_DIR, ELB_AWS_JOB_IDS)}: error code {err_code}')
-                else:
-                    logging.debug(f'{fnx_name} raised exception on ClientError: {pformat(err.response)}')
-                    raise
+        try:
+            body = self.job_ids_s3_object.get()['Body'].read()
+            self.job_ids.merge(JobIds.from_json(body))
+            self.job_ids_loaded_at = time.monotonic()
+        except ClientError as err:
+            err_code = err.response['Error']['Code']
+            fnx_name = inspect.stack()[0].function
+            # GetObject reports a missing object as NoSuchKey, HeadObject as 404
+            if err_code in ('404', 'NoSuchKey'):
+                self.job_ids_loaded_at = time.monotonic()
+                logging.debug(f'{fnx_name} failed to retrieve {os.path.join(self.results_bucket, ELB_METADATA_DIR, ELB_AWS_JOB_IDS)}: error code {err_code}')
+            else:
+                logging.debug(f'{fnx_name} raised exception on ClientError: {pformat(err.response)}')
+                raise
 
     @handle_aws_error
     def _check_status(self, extended) -> Tuple[Dict[str, int], Dict[str, str]]:
@@ -997,77 +1148,87 @@ class ElasticBlastAws(ElasticBlast):
             logging.info('dry-run: would have checked status')
             return counts, {}
 
+        if not self.job_ids and (self.job_ids_loaded_at is None or
+                time.monotonic() - self.job_ids_loaded_at > JOB_IDS_CACHE_TTL):
+            self._load_job_ids_from_aws()
+
         if extended:
             return self._check_status_extended()
 
-        if not self.job_ids:
-            self._load_job_ids_from_aws()
-        job_ids = self.job_ids.to_list()
-
-        # check status of jobs in batches of JOB_BATCH_NUM
-        JOB_BATCH_NUM = 100
-        for i in range(0, len(job_ids), JOB_BATCH_NUM):
-            job_batch = self.batch.describe_jobs(jobs=job_ids[i:i + JOB_BATCH_NUM])['jobs']
-            # get number for AWS Batch job states
-            for st in AWS_BATCH_JOB_STATES:
-                counts[st] += sum([j['status'] == st for j in job_batch])
+        # get number for AWS Batch job states, jobs in terminal states never
+        # change state, so only the remaining jobs are described
+        job_ids = [j for j in self.job_ids.to_list() if j not in self.finished_job_ids]
+        counts = Counter()
+        for job in self._describe_jobs(job_ids):
+            if job['status'] in AWS_BATCH_TERMINAL_JOB_STATES:
+                self.finished_job_ids.add(job['jobId'])
+                self.finished_job_counts[job['status']] += 1
+            else:
+                counts[job['status']] += 1
+        counts.update(self.finished_job_counts)
 
         # compute numbers for elastic-blast job states
         status = {
-            'pending': counts['SUBMITTED'] + counts['PENDING'] + counts['RUNNABLE'] + counts['STARTING'],
+            'pending': sum(counts[st] for st in AWS_BATCH_PENDING_JOB_STATES),
             'running':  counts['RUNNING'],
             'succeeded': counts['SUCCEEDED'],
             'failed': counts['FAILED'],
         }
         return status, {}
 
+    def _describe_jobs(self, job_ids: List[str]) -> List[Dict[str, Any]]:
+        """ Get AWS Batch job descriptions for the given job ids. The jobs are
+        described in batches of JOB_BATCH_NUM, requested concurrently. """
+        JOB_BATCH_NUM = 100
+        chunks = [job_ids[i:i + JOB_BATCH_NUM] for i in range(0, len(job_ids), JOB_BATCH_NUM)]
+        with ThreadPoolExecutor(max_workers=ELB_AWS_STATUS_CHECK_THREADS) as executor:
+            job_batches = executor.map(lambda c: self.batch.describe_jobs(jobs=c)['jobs'], chunks)
+            return [j for job_batch in job_batches for j in job_batch]
+
     def _check_status_extended(self) -> Tuple[Dict[str, int], Dict[str, str]]:
         """ Internal check_status_extended, not protected against exceptions in AWS """
-        logging.debug(f'Retrieving jobs for queue {self.job_queue_name}')
         jobs = {}
-        # As statuses in AWS_BATCH_JOB_STATES are ordered in job transition
-        # succession, if job changes status between calls it will be reflected
-        # in updated value in jobs dictionary
-        for status in AWS_BATCH_JOB_STATES:
-            batch_of_jobs = self.batch.list_jobs(jobQueue=self.job_queue_name,
-                                            jobStatus=status)
-            for j in batch_of_jobs['jobSummaryList']:
-                jobs[j['jobId']] = j
-
-            while 'nextToken' in batch_of_jobs:
-                batch_of_jobs = self.batch.list_jobs(jobQueue=self.job_queue_name,
-                                                    jobStatus=status,
-                                                    nextToken=batch_of_jobs['nextToken'])
-                for j in batch_of_jobs['jobSummaryList']:
-                    jobs[j['jobId']] = j
+        if self.job_ids:
+            # describe_jobs returns all the details reported below for up to
+            # 100 jobs per call, far fewer calls than listing every job state
+            job_ids = self.job_ids.to_list()
+            logging.debug(f'Describing {len(job_ids)} jobs')
+            jobs = {j['jobId']: j for j in self._describe_jobs(job_ids)}
+        else:
+            logging.debug(f'Retrieving jobs for queue {self.job_queue_name}')
+            # As statuses in AWS_BATCH_JOB_STATES are ordered in job transition
+            # succession, if job changes status between calls it will be reflected
+            # in updated value in jobs dictionary
+            paginator = self.batch.get_paginator('list_jobs')
+            for status in AWS_BATCH_JOB_STATES:
+                for page in paginator.paginate(jobQueue=self.job_queue_name, jobStatus=status):
+                    for j in page['jobSummaryList']:
+                        jobs[j['jobId']] = j
         counts : Dict[str, int] = defaultdict(int)
         detailed_info: Dict[str, List[str]] = defaultdict(list)
-        pending_set = set(['SUBMITTED', 'PENDING', 'RUNNABLE', 'STARTING'])
         for job_id, job in jobs.items():
-            if job['status'] in pending_set:
+            if job['status'] in AWS_BATCH_PENDING_JOB_STATES:
                 status = 'pending'
             else:
                 status = job['status'].lower()
             counts[status] += 1
-            info = [f' {len(detailed_info[status])+1}. ']
-            for k in ['jobArn', 'jobName', 'statusReason']:
+            info = detailed_info[status]
+            info.append(f' {counts[status]}. ')
+            for k, label in STATUS_REPORT_JOB_FIELDS:
                 if k in job:
-                    info.append(f'  {k[0].upper()+k[1:]}: {job[k]}')
+                    info.append(f'  {label}: {job[k]}')
             if 'container' in job:
                 container = job['container']
-                for k in ['exitCode', 'reason']:
+                for k, label in STATUS_REPORT_CONTAINER_FIELDS:
                     if k in container:
-                        info.append(f'  Container{k[0].upper()+k[1:]}: {container[k]}')
+                        info.append(f'  {label}: {container[k]}')
             if 'startedAt' in job and 'stoppedAt' in job:
                 # NB: these Unix timestamps are in milliseconds
                 info.append(f'  RuntimeInSeconds: {(job["stoppedAt"] - job["startedAt"])/1000}')
-            detailed_info[status].append('\n'.join(info))
         detailed_rep = []
-        for status in ['pending', 'running', 'succeeded', 'failed']:
-            jobs_in_status = len(detailed_info[status])
-            detailed_rep.append(f'{status.capitalize()} {jobs_in_status}')
-            if jobs_in_status:
-                detailed_rep.append('\n'.join(detailed_info[status]))
+        for status in STATUS_REPORT_ORDER:
+            detailed_rep.append(f'{status.capitalize()} {counts.get(status, 0)}')
+            detailed_rep.extend(detailed_info[status])
         return counts, {STATUS_MESSAGE_VERBOSE: '\n'.join(detailed_rep)}
 
     def _remove_ancillary_data(self, bucket_prefix: str) -> None:
@@ -1076,22 +1237,45 @@ class ElasticBlastAws(ElasticBlast):
         """
         bname, pname = parse_bucket_name_key(self.results_bucket)
         if not self.dry_run:
-            s3_bucket = self.s3.Bucket(bname)
-            s3_bucket.objects.filter(Prefix=f'{pname}/{bucket_prefix}').delete()
+            # each page of at most 1000 keys is deleted with a single
+            # DeleteObjects call while the next page is listed
+            DELETE_THREADS = 8
+            client = self.s3.meta.client
+            paginator = client.get_paginator('list_objects_v2')
+            with ThreadPoolExecutor(max_workers=DELETE_THREADS) as executor:
+                futures = []
+                for page in paginator.paginate(Bucket=bname, Prefix=f'{pname}/{bucket_prefix}'):
+                    keys = [{'Key': obj['Key']} for obj in page.get('Contents', [])]
+                    if keys:
+                        futures.append(executor.submit(client.delete_objects, Bucket=bname,
+                                                       Delete={'Objects': keys, 'Quiet': True}))
+                for future in futures:
+                    for err in future.result().get('Errors', []):
+                        logging.debug(f'Failed to delete s3://{bname}/{err["Key"]}: {err["Message"]}')
         else:
             logging.debug(f'dry-run: would have removed {bname}/{pname}/{bucket_prefix}')
 
-    def _get_cloudformation_errors(self) -> List[str]:
+    def _get_cloudformation_errors(self, operation: str) -> List[str]:
         """Iterate over cloudformation stack events and extract error messages
         for failed resource creation or deletion. Cloudformation stack object
         must already be initialized.
+
+        Arguments:
+            operation: Stack operation whose errors are reported, CREATE or DELETE
         """
         # cloudformation stack must be initialized
         assert self.cf_stack
         messages = []
+        # Events are listed newest first and fetched from AWS one page at a
+        # time, so stop at the event that started the reported stack
+        # operation rather than walk the whole stack history. A failed
+        # stack creation is followed by a stack deletion, whose events
+        # are listed before the creation errors.
         for event in self.cf_stack.events.all():
-            if event.resource_status == 'CREATE_FAILED' or \
-                    event.resource_status == 'DELETE_FAILED':
+            if event.logical_resource_id == self.stack_name and \
+                    event.resource_status == f'{operation}_IN_PROGRESS':
+                break
+            if event.resource_status in CF_RESOURCE_FAILED_STATES:
                 # resource creation may be canceled because other resources
                 # were not created, these are not useful for reporting
                 # problems
@@ -1102,12 +1286,11 @@ class ElasticBlastAws(ElasticBlast):
     def __str__(self):
         """ Print details about stack passed in as an argument, for debugging """
         st = self.cf_stack
-        retval = f'Stack id: {st.stack_id}'
-        retval += f'Stack name: {st.stack_name}'
-        retval += f'Stack description: {st.description}'
-        retval += f'Stack creation-time: {st.creation_time}'
-        retval += f'Stack last-update: {st.last_updated_time}'
-        retval += f'Stack status: {st.stack_status}'
-        retval += f'Stack status reason: {st.stack_status_reason}'
-        retval += f'Stack outputs: {st.outputs}'
-        return retval
+        return '\n'.join([f'Stack id: {st.stack_id}',
+                          f'Stack name: {st.stack_name}',
+                          f'Stack description: {st.description}',
+                          f'Stack creation-time: {st.creation_time}',
+                          f'Stack last-update: {st.last_updated_time}',
+                          f'Stack status: {st.stack_status}',
+                          f'Stack status reason: {st.stack_status_reason}',
+                          f'Stack outputs: {st.outputs}'])
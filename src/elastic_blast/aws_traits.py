@@ -27,19 +27,24 @@ from botocore.config import Config  # type: ignore
 import boto3 # type: ignore
 from botocore.exceptions import ClientError, NoCredentialsError # type: ignore
 import logging
-from typing import Optional, List, Any
+from functools import lru_cache
+from typing import Optional, List, Any, Tuple
 from .util import UserReportError, check_aws_region_for_invalid_characters
 from .base import InstanceProperties, PositiveInteger, MemoryStr
 from .constants import ELB_DFLT_AWS_REGION, INPUT_ERROR, PERMISSIONS_ERROR
+from .constants import ELB_AWS_MAX_ATTEMPTS
 
 
 def create_aws_config(region: Optional[str] = None) -> Config:
     """Create boto3 config object using application config parameters"""
+    # Adaptive retry mode absorbs AWS API throttling in the client with
+    # backoff and client side rate limiting
+    retries = {'max_attempts': ELB_AWS_MAX_ATTEMPTS, 'mode': 'adaptive'}
     retval = None
     if region:
-        retval = Config(region_name=region)
+        retval = Config(region_name=region, retries=retries)
     else:
-        retval = Config(region_name=ELB_DFLT_AWS_REGION)
+        retval = Config(region_name=ELB_DFLT_AWS_REGION, retries=retries)
     return retval
 
 
@@ -53,18 +58,36 @@ def get_regions(boto_cfg: Config = None) -> List[str]:
     return []
 
 
+@lru_cache(maxsize=None)
+def _describe_availability_zones(region: str) -> Tuple[str, ...]:
+    """ Get availability zone names for the given region, the results are
+    cached as they do not change while the application runs """
+    ec2 = boto3.client('ec2', region_name=region)
+    response = ec2.describe_availability_zones(Filters=[{'Name':'region-name', 'Values': [region]}])
+    return tuple(r['ZoneName'] for r in response['AvailabilityZones'])
+
+
 def get_availability_zones_for(region: str) -> List[str]:
     """ Get a list of availability zones for the given region """
     check_aws_region_for_invalid_characters(region)
-    ec2 = boto3.client('ec2', region_name=region)
     try:
-        response = ec2.describe_availability_zones(Filters=[{'Name':'region-name', 'Values': [region]}])
-        return [r['ZoneName'] for r in response['AvailabilityZones']]
+        return list(_describe_availability_zones(region))
     except ClientError as err:
         logging.debug(err)
     return []
 
 
+@lru_cache(maxsize=None)
+def _describe_instance_type(instance_type: str, region: Optional[str]) -> InstanceProperties:
+    """ Get the number of vCPUs and memory in GB for a given instance type,
+    the results are cached as they do not change while the application runs """
+    ec2 = boto3.client('ec2') if region is None else boto3.client('ec2', config=create_aws_config(region))
+    rv = ec2.describe_instance_types(InstanceTypes=[instance_type])
+    ncpus = int(rv['InstanceTypes'][0]['VCpuInfo']['DefaultVCpus'])
+    nram = int(rv['InstanceTypes'][0]['MemoryInfo']['SizeInMiB']) / 1024
+    return InstanceProperties(ncpus, nram)
+
+
 def get_machine_properties(instance_type: str, boto_cfg: Config = None) -> InstanceProperties:
     """ Get the number of vCPUs and memory in GB for a given instance type
     instance_type: name of the AWS EC2 instance type
@@ -74,18 +97,15 @@ def get_machine_properties(instance_type: str, boto_cfg: Config = None) -> Insta
     """
     if instance_type.lower() == 'optimal':
         raise ValueError('optimal instance type is not supported in get_machine_properties')
-    ec2 = boto3.client('ec2') if boto_cfg == None else boto3.client('ec2', config=boto_cfg)
+    region = None if boto_cfg == None else boto_cfg.region_name
     try:
-        rv = ec2.describe_instance_types(InstanceTypes=[instance_type])
-        ncpus = int(rv['InstanceTypes'][0]['VCpuInfo']['DefaultVCpus'])
-        nram = int(rv['InstanceTypes'][0]['MemoryInfo']['SizeInMiB']) / 1024
+        return _describe_instance_type(instance_type, region)
     except ClientError as err:
         logging.debug(err)
         raise UserReportError(returncode=INPUT_ERROR, message=f'Invalid AWS machine type "{instance_type}"')
     except NoCredentialsError as err:
         logging.debug(err)
         raise UserReportError(returncode=PERMISSIONS_ERROR, message=str(err))
-    return InstanceProperties(ncpus, nram)
 
 
 def get_instance_type_offerings(region: str) -> List[str]:
@@ -94,8 +114,8 @@ def get_instance_type_offerings(region: str) -> List[str]:
     try:
         current = ec2.describe_instance_type_offerings(LocationType='region', Filters=[{'Name': 'location', 'Values': [region]}])
         instance_types = current['InstanceTypeOfferings']
-        while 'NextToken' in current:
-            current = ec2.describe_instance_type_offerings(LocationType='regioon', Filters=[{'Name': 'location', 'Values': [region]}], NextToken=current['NextToken'])
+        while (token := current.get('NextToken')):
+            current = ec2.describe_instance_type_offerings(LocationType='region', Filters=[{'Name': 'location', 'Values': [region]}], NextToken=token)
             instance_types += current['InstanceTypeOfferings']
     except ClientError as err:
         logging.debug(err)
@@ -29,7 +29,25 @@ import configparser
 import re
 from dataclasses import dataclass, field, Field, fields, _MISSING_TYPE
 from enum import Enum, auto
-from typing import Dict, List, Union, Optional, NamedTuple
+from functools import lru_cache
+from typing import Dict, List, Union, Optional, NamedTuple, FrozenSet, Tuple
+
+@lru_cache(maxsize=None)
+def get_field_names(cls) -> FrozenSet[str]:
+    """Return a set of dataclass field names for a class. The set is
+    computed once per class."""
+    return frozenset(i.name for i in fields(cls))
+
+
+@lru_cache(maxsize=None)
+def get_mapped_init_fields(cls) -> Tuple[Tuple[Field, 'ParamInfo'], ...]:
+    """For a ConfigParserToDataclassMapper subclass, return pairs of
+    constructor dataclass fields and the ConfigParser parameters they are
+    mapped to. Fields mapped to None are skipped. The result is computed once
+    per class."""
+    return tuple((field, cls.mapping[field.name]) for field in fields(cls)
+                 if field.init and cls.mapping[field.name] is not None)
+
 
 @dataclass(frozen=True)
 class InstanceProperties:
@@ -188,32 +206,22 @@ class ConfigParserToDataclassMapper:
         # check that all dataclass attributes are mapped to configparser params
         cls.validate_mapping()
         errors = []
-        for field in fields(cls):
-            if field.init:
-                mapped = cls.mapping[field.name]
-                # ignore dataclass attributes mapped to None
-                if mapped is None:
-                    continue
-                # skip dataclass attributes that with default values and no
-                # parameter values in ConfigParser object
-                # field.default == dataclass._MISSING_TYPE means that the
-                # dataclass attribute has no default value
-                if not isinstance(field.default, _MISSING_TYPE) and \
-                       (mapped.section not in parser or \
-                        mapped.param_name not in parser[mapped.section]):
-                    continue
-
+        for field, mapped in get_mapped_init_fields(cls):
+            # skip dataclass attributes that with default values and no
+            # parameter values in ConfigParser object
+            # field.default == dataclass._MISSING_TYPE means that the
+            # dataclass attribute has no default value
+            if mapped.section not in parser or \
+                   mapped.param_name not in parser[mapped.section]:
                 # report a required parameter missing in ConfigParser
-                if isinstance(field.default, _MISSING_TYPE) and \
-                       (mapped.section not in parser or \
-                        mapped.param_name not in parser[mapped.section]):
+                if isinstance(field.default, _MISSING_TYPE):
                     errors.append(f'Missing {mapped.param_name}')
-                    continue
+                continue
 
-                # initialize dataclass attribute value, call the appropriate
-                # class constructor
-                kwargs[field.name] = cls.initialize_value(field, mapped,
-                                                          parser, errors)
+            # initialize dataclass attribute value, call the appropriate
+            # class constructor
+            kwargs[field.name] = cls.initialize_value(field, mapped,
+                                                      parser, errors)
 
         # report attribute initialization errors
         if errors:
@@ -382,7 +390,7 @@ class ConfigParserToDataclassMapper:
         """Prevent creation of new attributes to catch misspelled class
         attribute values. Raises AttributeError if a value is being assigned to
         a new class attribute."""
-        if name not in [i.name for i in fields(self)]:
+        if name not in get_field_names(type(self)):
             raise AttributeError(f'Attribute {name} does not exist in class {type(self)}')
         super().__setattr__(name, value)
 
@@ -390,7 +398,7 @@ class ConfigParserToDataclassMapper:
     def __getattr__(self, name):
         """Return None for uninitialized dataclass attributes.
         Raises AttrubuteError for other non-existant class attributes"""
-        if name in [i.name for i in fields(self)]:
+        if name in get_field_names(type(self)):
             return None
         else:
             raise AttributeError(f'"{type(self).__name__}" has no attribute "{name}"')
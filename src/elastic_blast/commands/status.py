@@ -26,10 +26,12 @@ Author: Victor Joukov joukovv@ncbi.nlm.nih.gov
 
 import sys
 import time
+import random
 import logging
 from typing import Any, List
 
 from elastic_blast.constants import ElbCommand, ElbStatus, STATUS_MESSAGE_ERROR
+from elastic_blast.constants import ELB_STATUS_WAIT_MIN_INTERVAL, ELB_STATUS_WAIT_MAX_INTERVAL
 from elastic_blast.elasticblast_factory import ElasticBlastFactory
 from elastic_blast.elb_config import ElasticBlastConfig
 
@@ -55,6 +57,8 @@ def _status(args, cfg: ElasticBlastConfig, clean_up_stack: List[Any]) -> int:
     try:
         verbose_result = {}
         elastic_blast = ElasticBlastFactory(cfg, False, clean_up_stack)
+        interval = ELB_STATUS_WAIT_MIN_INTERVAL
+        prev_counts = None
         while True:
             status, counts, verbose_result = elastic_blast.check_status(args.verbose)
             result = str(status)
@@ -66,7 +70,14 @@ def _status(args, cfg: ElasticBlastConfig, clean_up_stack: List[Any]) -> int:
             logging.debug(result)
             if not args.wait or status in (ElbStatus.SUCCESS, ElbStatus.FAILURE, ElbStatus.UNKNOWN):
                 break
-            time.sleep(20)  # TODO: make this a parameter (granularity)
+            # Back off while nothing changes to reduce cloud API calls,
+            # jitter avoids lockstep with other clients in the same account
+            if counts == prev_counts:
+                interval = min(interval * 2, ELB_STATUS_WAIT_MAX_INTERVAL)
+            else:
+                interval = ELB_STATUS_WAIT_MIN_INTERVAL
+            prev_counts = counts
+            time.sleep(random.uniform(0.8, 1.2) * interval)
     except RuntimeError as err:
         if args.exit_code:
             returncode = ElbStatus.FAILURE.value
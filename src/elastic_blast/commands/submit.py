@@ -47,7 +47,7 @@ from elastic_blast.constants import ELB_AWS_JOB_IDS, ELB_METADATA_DIR, ELB_STATE
 from elastic_blast.constants import ELB_QUERY_BATCH_DIR, BLASTDB_ERROR, INPUT_ERROR
 from elastic_blast.constants import PERMISSIONS_ERROR, CLUSTER_ERROR, CSP, QUERY_LIST_EXT
 from elastic_blast.constants import ElbCommand, ELB_META_CONFIG_FILE
-from elastic_blast.constants import ELB_S3_PREFIX, ELB_GCS_PREFIX
+from elastic_blast.constants import ELB_S3_PREFIX, ELB_GCS_PREFIX, ELB_CLOUD_PREFIXES
 from elastic_blast.taxonomy import setup_taxid_filtering
 from elastic_blast.config import validate_cloud_storage_object_uri
 from elastic_blast.elb_config import ElasticBlastConfig
@@ -268,8 +268,7 @@ def assemble_query_file_list(cfg: ElasticBlastConfig) -> List[str]:
                     if len(line.rstrip()) == 0:
                         continue
                     query_file_from_list = line.rstrip()
-                    if query_file_from_list.startswith(ELB_GCS_PREFIX) or \
-                           query_file_from_list.startswith(ELB_S3_PREFIX):
+                    if query_file_from_list.startswith(ELB_CLOUD_PREFIXES):
                         try:
                             validate_cloud_storage_object_uri(query_file_from_list)
                         except ValueError as err:
@@ -113,6 +113,8 @@ ELB_DFLT_MIN_NUM_NODES = 1
 
 ELB_S3_PREFIX = 's3://'
 ELB_GCS_PREFIX = 'gs://'
+# For str.startswith tests for either cloud bucket URI
+ELB_CLOUD_PREFIXES = (ELB_S3_PREFIX, ELB_GCS_PREFIX)
 ELB_HTTP_PREFIX = 'http'
 ELB_FTP_PREFIX = 'ftp://'
 
@@ -167,6 +169,23 @@ ELB_K8S_JOB_SUBMISSION_MAX_RETRIES=5    # Try up to this many times
 ELB_K8S_JOB_SUBMISSION_TIMEOUT=600      # or a maximum of this many seconds
 ELB_K8S_JOB_SUBMISSION_MIN_WAIT=1       # Randomly wait between 1 and ...
 ELB_K8S_JOB_SUBMISSION_MAX_WAIT=5       # ... 5 seconds
+ELB_K8S_JOB_SUBMISSION_THREADS=16       # Job files submitted concurrently
+
+# AWS API calls are retried on throttling and transient errors up to this
+# many times in total, see aws_traits.create_aws_config
+ELB_AWS_MAX_ATTEMPTS=10
+
+# AWS Batch job submission parameters
+ELB_AWS_JOB_SUBMISSION_THREADS=10       # Matches botocore's default connection pool size
+# https://docs.aws.amazon.com/batch/latest/userguide/service_limits.html
+ELB_AWS_JOB_SUBMISSION_RATE=45          # SubmitJob calls per second, quota is 50
+ELB_AWS_STATUS_CHECK_THREADS=8          # Concurrent DescribeJobs calls when checking status
+# https://docs.aws.amazon.com/batch/latest/APIReference/API_ListJobs.html
+ELB_AWS_LIST_JOBS_PAGE_SIZE=1000        # Jobs per ListJobs call, the default is 100
+
+# Status polling parameters for elastic-blast status --wait
+ELB_STATUS_WAIT_MIN_INTERVAL=20         # Initial wait between status checks in seconds, ...
+ELB_STATUS_WAIT_MAX_INTERVAL=120        # ... doubled while job counts do not change, up to this
 
 
 # Exit codes
@@ -32,6 +32,7 @@ from json.decoder import JSONDecodeError
 from marshmallow.exceptions import ValidationError
 from typing import List, Optional
 from .constants import MolType, ELB_S3_PREFIX, ELB_GCS_PREFIX, BLASTDB_ERROR
+from .constants import ELB_CLOUD_PREFIXES
 from .filehelper import open_for_read, check_for_read
 from .base import DBSource
 from .util import UserReportError
@@ -75,7 +76,7 @@ def get_db_metadata(db: str, dbtype: MolType, source: DBSource, dry_run: bool =
     db_path = db
 
     # if an NCBI-provided database
-    if not db.startswith(ELB_S3_PREFIX) and not db.startswith(ELB_GCS_PREFIX):
+    if not db.startswith(ELB_CLOUD_PREFIXES):
         if source == DBSource.AWS or source == DBSource.GCP:
             bucket = DB_BUCKET_AWS if source == DBSource.AWS else DB_BUCKET_GCP
             try:
@@ -27,7 +27,7 @@ Created: Tue 09 Feb 2021 03:52:31 PM EDT
 
 import os
 from dataclasses import dataclass
-from dataclasses import InitVar, field, fields, asdict
+from dataclasses import InitVar, field, asdict
 from dataclasses_json import dataclass_json, LetterCase, config
 import getpass
 from hashlib import md5
@@ -39,6 +39,7 @@ import socket
 import logging
 import shlex
 from collections import defaultdict
+from functools import lru_cache
 import json
 import boto3 # type: ignore
 from enum import Enum
@@ -82,6 +83,7 @@ from .constants import GCP_MAX_NUM_LABELS, AWS_MAX_NUM_LABELS
 from .constants import SYSTEM_MEMORY_RESERVE, ELB_AWS_ARM_INSTANCE_TYPE_REGEX
 from .constants import ELB_DFLT_AWS_NUM_CPUS, ELB_DFLT_GCP_NUM_CPUS
 from .constants import ELB_S3_PREFIX, ELB_GCS_PREFIX, ELB_UNKNOWN_MAX_NUMBER_OF_CONCURRENT_JOBS
+from .constants import ELB_CLOUD_PREFIXES
 from .constants import AWS_ROLE_PREFIX, CFG_CP_AWS_AUTO_SHUTDOWN_ROLE
 from .constants import BLASTDB_ERROR, ELB_UNKNOWN, ELB_JANITOR_SCHEDULE
 from .constants import ELB_DFLT_GCP_REGION, ELB_DFLT_GCP_ZONE
@@ -98,39 +100,44 @@ from .aws_traits import get_regions as aws_get_regions
 from .aws_traits import create_aws_config
 from .base import InstanceProperties, PositiveInteger, Percentage
 from .base import ParamInfo, ConfigParserToDataclassMapper, DBSource, MemoryStr
+from .base import get_field_names
 from .config import validate_cloud_storage_object_uri, _validate_csp
 from .db_metadata import DbMetadata, get_db_metadata
 from .tuner import get_mem_limit, get_machine_type, get_mt_mode, get_batch_length
 from .tuner import MTMode
 
 
+# Matches -outfmt BLAST option, but not other options that start with -outfmt
+re_outfmt = re.compile(r'(?:^|\s)-outfmt(?:\s|$)')
+
+
 # Config parameter types
 
+@lru_cache(maxsize=256)
+def _short_md5(value: str) -> str:
+    """Return the first 9 characters of md5 hex digest of a string"""
+    return md5(value.encode()).hexdigest()[0:9]
+
+
 class CloudURI(str):
     """A subclass of str that only accepts valid cloud bucket URIs and
     computes md5 hash value of the URI. The value
     is validated before object creation. The hashed value is available via
     class attribute md5 or via method compute_md5"""
+    md5: str
+
     def __new__(cls, value):
-        """Constructor, validates that argumant is a valid cloud bucket uri"""
+        """Constructor, validates that argumant is a valid cloud bucket uri
+        and computes its md5 hash"""
         validate_cloud_storage_object_uri(str(value))
         # canonicalize path
         canonical_value = str(value)[:-1] if str(value)[-1] == '/' else value
-        return super(cls, cls).__new__(cls, canonical_value)
-
-    def __init__(self, value):
-        """Initialize md5 hashed cloud URI"""
-        self.md5 = None
-        self.compute_md5()
+        obj = super(cls, cls).__new__(cls, canonical_value)
+        obj.md5 = _short_md5(str(obj))
+        return obj
 
     def compute_md5(self) -> str:
-        """Compute hashed URI and store hashed value in object attribute"""
-        if self.md5:
-            return self.md5
-        else:
-            digest = md5(self.encode())
-            short_digest = digest.hexdigest()[0:9]
-            self.md5 = short_digest
+        """Return hashed URI"""
         return self.md5
 
     def get_cloud_provider(self) -> CSP:
@@ -349,7 +356,7 @@ class BlastConfig(ConfigParserToDataclassMapper):
                
 
     def __post_init__(self):
-        if self.options.find('-outfmt') < 0:
+        if not re_outfmt.search(self.options):
             self.options += f' -outfmt {ELB_DFLT_OUTFMT}'
 
 
@@ -371,7 +378,7 @@ class BlastConfig(ConfigParserToDataclassMapper):
             '-in_msa'
         ])
         for query_file in self.queries_arg.split():
-            if query_file.startswith(ELB_S3_PREFIX) or query_file.startswith(ELB_GCS_PREFIX):
+            if query_file.startswith(ELB_CLOUD_PREFIXES):
                 try:
                     validate_cloud_storage_object_uri(query_file)
                 except ValueError as err:
@@ -658,7 +665,7 @@ class ElasticBlastConfig:
             except FileNotFoundError:
                 # database metadata file is not mandatory for a user database (yet) EB-1308
                 logging.info('No database metadata')
-                if not self.blast.db.startswith(ELB_S3_PREFIX) and not self.blast.db.startswith(ELB_GCS_PREFIX):
+                if not self.blast.db.startswith(ELB_CLOUD_PREFIXES):
                     raise UserReportError(returncode=BLASTDB_ERROR,
                                           message=f'Metadata for BLAST database "{self.blast.db}" was not found. Please, make sure that the database exists and database molecular type corresponds to your blast program: "{self.blast.program}". To get a list of NCBI provided databases, please see https://github.com/ncbi/blast_plus_docs#blast-databases.')
                 else:
@@ -745,7 +752,7 @@ class ElasticBlastConfig:
     def __getattr__(self, name):
         """Return None for uninitialized dataclass attributes.
         Raises AttrubuteError for other non-existant class attributes"""
-        if name in [i.name for i in fields(self)]:
+        if name in get_field_names(type(self)):
             return None
         else:
             raise AttributeError(f'"{type(self).__name__}" has no attribute "{name}"')
@@ -755,7 +762,7 @@ class ElasticBlastConfig:
         """Prevent creation of new attributes to catch misspelled class
         attribute values. Raises AttributeError if a value is being assigned to
         a new class attribute."""
-        if not name in [i.name for i in fields(self)]:
+        if name not in get_field_names(type(self)):
             raise AttributeError(f'Attribute {name} does not exit in class {type(self)}')
         super().__setattr__(name, value)
 
@@ -773,9 +780,9 @@ class ElasticBlastConfig:
         self.cluster = ClusterConfig.create_from_cfg(cfg)
 
         # determine cloud provider, first by user config, then results bucket
-        if sum([i.startswith('aws') for i in cfg[CFG_CLOUD_PROVIDER]]) > 0:
+        if any(i.startswith('aws') for i in cfg[CFG_CLOUD_PROVIDER]):
             cloud = CSP.AWS
-        elif sum([i.startswith('gcp') for i in cfg[CFG_CLOUD_PROVIDER]]) > 0:
+        elif any(i.startswith('gcp') for i in cfg[CFG_CLOUD_PROVIDER]):
             cloud = CSP.GCP
         else:
             cloud = self.cluster.results.get_cloud_provider()
@@ -889,10 +896,10 @@ class ElasticBlastConfig:
         else:
             self.aws.validate(errors, task)
 
+        # BLAST and cluster parameters are validated only for submit
         if task == ElbCommand.SUBMIT:
             self.blast.validate(errors, task)
-
-        self.cluster.validate(errors, task)
+            self.cluster.validate(errors, task)
 
         if self.cloud_provider.cloud == CSP.GCP and \
                not self.cluster.results.startswith(ELB_GCS_PREFIX):
@@ -951,26 +958,9 @@ class ElasticBlastConfig:
     def _clean_dict(indict: Dict[str, Any]):
         """Remove unimportant config parameters (mapping and equal to None) from
         the object converted to a dictionary."""
-        remove: List[Any] = []
-        if 'mapping' in indict:
-            remove.append('mapping')
-        for key in indict:
-            if indict[key] is None:
-                remove.append(key)
-        for key in remove:
-            del indict[key]
-
-        remove = []
-        for key_1 in indict:
-            if not isinstance(indict[key_1], dict):
-                continue
-            if 'mapping' in indict[key_1]:
-                remove.append((key_1, 'mapping'))
-            for key_2 in indict[key_1]:
-                if indict[key_1][key_2] is None:
-                    remove.append((key_1, key_2))
-        for key_1, key_2 in remove:
-            del indict[key_1][key_2]
+        for subdict in [indict] + [v for v in indict.values() if isinstance(v, dict)]:
+            for key in [k for k, v in subdict.items() if v is None or k == 'mapping']:
+                del subdict[key]
 
 
     def asdict(self) -> Dict[str, Any]:
@@ -1155,16 +1145,20 @@ def create_labels(cloud_provider: CSP,
 
 
 
+re_gcp_label_invalid_chars = re.compile(r'\W', flags=re.ASCII)
+re_aws_tag_invalid_chars = re.compile(r'[^\w_\.:/+@]', flags=re.ASCII)
+
+
 def sanitize_gcp_label(input_label: str) -> str:
     """ Changes the input_label so that it is composed of valid GCP label characters"""
-    return re.sub(r'\W', '-', input_label.lower(), flags=re.ASCII)[:GCP_MAX_LABEL_LENGTH]
+    return re_gcp_label_invalid_chars.sub('-', input_label.lower())[:GCP_MAX_LABEL_LENGTH]
 
 
 def sanitize_aws_tag(input_label: str) -> str:
     """ Changes the input_label so that it is composed of valid AWS tag characters"""
     # NB: this AWS sanitizer is a bit more restrictive - it replaces '=' to
     # simplify dataflow for GCP
-    return re.sub(r'[^\w_\.:/+@]', '-', input_label, flags=re.ASCII)[:AWS_MAX_TAG_LENGTH]
+    return re_aws_tag_invalid_chars.sub('-', input_label)[:AWS_MAX_TAG_LENGTH]
 
 
 def get_instance_props(cloud_provider: CSP, region: str, machine_type: str) -> InstanceProperties:
@@ -39,6 +39,7 @@ from string import digits
 from random import sample
 from timeit import default_timer as timer
 from contextlib import contextmanager
+from functools import lru_cache
 from tenacity import retry, stop_after_attempt, wait_exponential
 from typing import Dict, IO, Tuple, Iterable, Generator, TextIO, List, Optional
 
@@ -50,6 +51,7 @@ from .base import QuerySplittingResults
 from .util import safe_exec, SafeExecError
 from .constants import ELB_GCP_BATCH_LIST, ELB_METADATA_DIR, ELB_QUERY_LENGTH, ELB_QUERY_BATCH_DIR
 from .constants import ELB_S3_PREFIX, ELB_GCS_PREFIX, ELB_FTP_PREFIX, ELB_HTTP_PREFIX
+from .constants import ELB_CLOUD_PREFIXES
 from .constants import ELB_QUERY_BATCH_FILE_PREFIX
 
 
@@ -539,6 +541,7 @@ def get_error(fileobj):
     return ''
 
 
+@lru_cache(maxsize=256)
 def parse_bucket_name_key(fname: str) -> Tuple[str, str]:
     """ Parse S3 or GS uri name into bucket and key.
     Parameters:
@@ -550,7 +553,7 @@ def parse_bucket_name_key(fname: str) -> Tuple[str, str]:
         for example above ('test-bucket', 'file_name.ext')
     """
     bare_name = fname
-    if fname.startswith(ELB_S3_PREFIX) or fname.startswith(ELB_GCS_PREFIX):
+    if fname.startswith(ELB_CLOUD_PREFIXES):
         bare_name = fname[5:]
     parts = bare_name.split('/')
     bucket = parts[0]
@@ -561,8 +564,7 @@ def parse_bucket_name_key(fname: str) -> Tuple[str, str]:
 def _is_local_file(filename: str) -> bool:
     """ Returns true if the file name passed to this function is locally
     accessible """
-    if filename.startswith(ELB_S3_PREFIX) or filename.startswith(ELB_GCS_PREFIX) or \
-        filename.startswith(ELB_FTP_PREFIX) or filename.startswith(ELB_HTTP_PREFIX):
+    if filename.startswith(ELB_CLOUD_PREFIXES + (ELB_FTP_PREFIX, ELB_HTTP_PREFIX)):
         return False
     return True
 
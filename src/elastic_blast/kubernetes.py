@@ -28,6 +28,8 @@ import json
 import logging
 import pathlib
 import time
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 from tenacity import retry, stop_after_delay, stop_after_attempt, wait_random
 from timeit import default_timer as timer
 from pkg_resources import resource_string, resource_filename, set_extraction_path
@@ -35,6 +37,7 @@ from tempfile import TemporaryDirectory
 from typing import List, Optional
 
 from .util import safe_exec, gcp_get_blastdb_latest_path, ElbSupportedPrograms, SafeExecError
+from .util import safe_exec_stream
 from .util import get_blastdb_info, UserReportError
 from .subst import substitute_params
 from .constants import ELB_JANITOR_DOCKER_IMAGE_GCP, ELB_PAUSE_AFTER_INIT_PV, ELB_DOCKER_IMAGE_GCP, ELB_QS_DOCKER_IMAGE_GCP, K8S_JOB_SUBMIT_JOBS
@@ -44,6 +47,7 @@ from .constants import ELB_K8S_JOB_SUBMISSION_MAX_WAIT
 from .constants import ELB_K8S_JOB_SUBMISSION_MIN_WAIT
 from .constants import ELB_K8S_JOB_SUBMISSION_MAX_RETRIES
 from .constants import ELB_K8S_JOB_SUBMISSION_TIMEOUT, ELB_METADATA_DIR
+from .constants import ELB_K8S_JOB_SUBMISSION_THREADS
 from .constants import K8S_MAX_JOBS_PER_DIR, ELB_STATE_DISK_ID_FILE, ELB_QUERY_BATCH_DIR
 from .constants import ELB_CJS_DOCKER_IMAGE_GCP
 from .constants import ElbExecutionMode, ELB_JANITOR_SCHEDULE
@@ -53,8 +57,10 @@ from .filehelper import open_for_write_immediate
 from .elb_config import ElasticBlastConfig
 
 
+@lru_cache(maxsize=None)
 def get_maximum_number_of_allowed_k8s_jobs(dry_run: bool = False) -> int:
-    """ Returns the maximum number of kubernetes jobs """
+    """ Returns the maximum number of kubernetes jobs. The result is cached,
+    as the resource quota does not change while the cluster exists """
     retval = 5000
     JSON_PATH = r"'{.spec.hard.count/jobs\.batch}'"
     cmd = f'kubectl get resourcequota gke-resource-quotas -o=jsonpath={JSON_PATH}'
@@ -91,7 +97,7 @@ def get_persistent_volumes(k8s_ctx: str) -> List[str]:
     cmd = f'kubectl --context={k8s_ctx} get pv -o json'
     p = safe_exec(cmd)
     try:
-        dvols = json.loads(p.stdout.decode())
+        dvols = json.loads(p.stdout)
     except Exception as err:
         raise RuntimeError('Error when parsing listing of Kubernetes persistent volumes ' + str(err))
     if dvols is None:
@@ -104,16 +110,15 @@ def get_persistent_disks(k8s_ctx: str, dry_run: bool = False) -> List[str]:
     Kubeconfig file determines the cluster that will be contacted.
 
     Raises:
-        util.SafeExecError on problems communicating with the cluster
-        json.decoder.JSONDecodeError on problems with parsing kubectl json output"""
-    cmd = f'kubectl --context={k8s_ctx} get pv -o json'
+        util.SafeExecError on problems communicating with the cluster"""
+    # kubectl prints only the volume handles, separated by spaces
+    cmd = f'kubectl --context={k8s_ctx} get pv -o jsonpath={{.items[*].spec.csi.volumeHandle}}'
     if dry_run:
         logging.info(cmd)
     else:
         p = safe_exec(cmd)
         if p.stdout:
-            pds = json.loads(p.stdout.decode())
-            return [i['spec']['csi']['volumeHandle'].split('/')[-1] for i in pds['items']]
+            return [i.split('/')[-1] for i in p.stdout.decode().split()]
     return list()
 
 
@@ -140,29 +145,31 @@ def submit_jobs(k8s_ctx: str, path: pathlib.Path, dry_run=False) -> List[str]:
     if not path.exists():
         raise RuntimeError(f'Path with kubernetes jobs "{path}" does not exist')
     if path.is_dir():
-        num_files = len(os.listdir(str(path)))
+        files = os.listdir(path)
+        num_files = len(files)
         if num_files == 0 and not dry_run:
             raise RuntimeError(f'Job directory {str(path)} is empty')
         elif num_files > K8S_MAX_JOBS_PER_DIR:
-            files = os.listdir(str(path))
-            for i, f in enumerate(sorted(files, key=lambda x: int(os.path.splitext(x)[0].split('_')[1]))):
-                retval += submit_jobs_with_retries(k8s_ctx, pathlib.Path(os.path.join(path, f)), dry_run)
-                perc_done = i / num_files * 100.
-                if i % 50 == 0:
-                    logging.debug(f'Submitted job file # {i} of {num_files} {perc_done:.2f}% done')
+            files.sort(key=lambda x: int(os.path.splitext(x)[0].split('_')[1]))
+            # job files are submitted concurrently, results are collected in
+            # file order
+            with ThreadPoolExecutor(max_workers=min(ELB_K8S_JOB_SUBMISSION_THREADS, num_files)) as executor:
+                job_names = executor.map(lambda f: submit_jobs_with_retries(k8s_ctx, path / f, dry_run), files)
+                for i, names in enumerate(job_names):
+                    retval += names
+                    perc_done = i / num_files * 100.
+                    if i % 50 == 0:
+                        logging.debug(f'Submitted job file # {i} of {num_files} {perc_done:.2f}% done')
             return retval
 
-    cmd = f'kubectl --context={k8s_ctx} apply -f {path} -o json'
+    # kubectl prints one resource/name line per submitted object
+    cmd = f'kubectl --context={k8s_ctx} apply -f {path} -o name'
     if dry_run:
         logging.info(cmd)
     else:
         p = safe_exec(cmd)
         if p.stdout:
-            out = json.loads(p.stdout.decode())
-            if 'items' in out:
-                retval = [i['metadata']['name'] for i in out['items']]
-            else:
-                retval = [out['metadata']['name']]
+            retval = [i.split('/')[-1] for i in p.stdout.decode().split()]
     return retval
 
 
@@ -177,6 +184,7 @@ def delete_all(k8s_ctx: str, dry_run: bool = False) -> List[str]:
 
     Raises:
         util.SafeExecError on problems with command line kubectl"""
+    get_maximum_number_of_allowed_k8s_jobs.cache_clear()
     commands1 = [f'kubectl --context={k8s_ctx} delete jobs --ignore-not-found=true -l app=setup',
                 f'kubectl --context={k8s_ctx} delete jobs --ignore-not-found=true -l app=blast']
     commands2 = [f'kubectl --context={k8s_ctx} delete pvc --all --force=true',
@@ -194,16 +202,17 @@ def delete_all(k8s_ctx: str, dry_run: bool = False) -> List[str]:
             else:
                 p = safe_exec(cmd)
                 if p.stdout:
-                    for line in p.stdout.decode().split('\n'):
+                    # work on bytes and decode only the object names
+                    for line in p.stdout.splitlines():
                         if line:
-                            if line.startswith('No resources found'):
+                            if line.startswith(b'No resources found'):
                                 # nothing was deleted
                                 break
-                            fields = line.rstrip().split()
+                            fields = line.split()
                             if len(fields) > 1:
-                                result.append(fields[1])
+                                result.append(fields[1].decode())
                             else:
-                                result.append(fields[0])
+                                result.append(fields[0].decode())
         return result
 
     def delete_finalizers(k8s_ctx: str, dry_run: bool = False):
@@ -232,9 +241,9 @@ def delete_all(k8s_ctx: str, dry_run: bool = False) -> List[str]:
             else:
                 p = safe_exec(cmd)
                 if p.stdout:
-                    for line in p.stdout.decode().split('\n'):
-                        if line.startswith("Status") or line.startswith("Finalizers"):
-                            logging.debug(f'{storage_obj} {line}')
+                    for line in p.stdout.splitlines():
+                        if line.startswith((b'Status', b'Finalizers')):
+                            logging.debug(f'{storage_obj} {line.decode()}')
 
     inspect_storage_objects_for_debugging(k8s_ctx, dry_run)
     # Delete the jobs first, wait, then delete the pvc and  pv
@@ -270,9 +279,9 @@ def get_jobs(k8s_ctx: str, selector: Optional[str] = None, dry_run: bool = False
         dry_run: Dry run
 
     Raises:
-        util.SafeExecError on problems with command line kubectl
-        RuntimeError for unexpected kubctl output"""
-    cmd = 'kubectl --context={k8s_ctx} get jobs -o json'
+        util.SafeExecError on problems with command line kubectl"""
+    # kubectl prints only the job names, separated by spaces
+    cmd = f'kubectl --context={k8s_ctx} get jobs -o jsonpath={{.items[*].metadata.name}}'
     if selector is not None:
         cmd += f' -l {selector}'
     if dry_run:
@@ -280,20 +289,29 @@ def get_jobs(k8s_ctx: str, selector: Optional[str] = None, dry_run: bool = False
         return list()
 
     p = safe_exec(cmd)
-    if not p.stdout:
-        # a small JSON structure is always returned, even if there are no jobs
-        raise RuntimeError('Unexpected lack of output for listing kubernetes jobs')
-    out = json.loads(p.stdout.decode())
-    return [i['metadata']['name'] for i in out['items']]
+    return p.stdout.decode().split()
 
 
 def _wait_for_job(k8s_ctx: str, job_file: pathlib.Path, attempts: int = 30, secs2wait: int = 60, dry_run: bool = False) -> None:
     """ Wait for the job to return successfully or raise a TimeoutError after specified number of attempts """
 
+    # kubectl wait watches the job on the server and returns as soon as the
+    # job completes, instead of sleeping secs2wait between status checks.
+    # It cannot wait for completion and failure at once, so the job status
+    # is checked after each wait to detect a failed job.
+    cmd = f'kubectl --context={k8s_ctx} wait --for=condition=complete --timeout={secs2wait}s -f {job_file}'
     for counter in range(attempts):
         if _job_succeeded(k8s_ctx, job_file, dry_run):
             break
-        time.sleep(secs2wait)
+        try:
+            safe_exec(cmd)
+        except SafeExecError as err:
+            logging.debug(err)
+            # kubectl wait has already waited secs2wait if it timed out.
+            # Other errors return at once, so wait here to keep the total
+            # wait time.
+            if 'timed out waiting' not in err.message:
+                time.sleep(secs2wait)
     else:
         raise TimeoutError(f'{job_file} timed out')
 
@@ -306,7 +324,9 @@ def _job_succeeded(k8s_ctx: str, k8s_job_file: pathlib.Path, dry_run: bool = Fal
     if not k8s_job_file.exists():
         raise FileNotFoundError(str(k8s_job_file))
 
-    cmd = f'kubectl --context={k8s_ctx} get -f {k8s_job_file} -o json'
+    # kubectl prints only the job condition types, and the succeeded and
+    # failed counts, separated by commas. Missing fields are printed empty.
+    cmd = f'kubectl --context={k8s_ctx} get -f {k8s_job_file} -o jsonpath={{.status.conditions[*].type}},{{.status.succeeded}},{{.status.failed}}'
 
     if dry_run:
         logging.info(cmd)
@@ -316,27 +336,18 @@ def _job_succeeded(k8s_ctx: str, k8s_job_file: pathlib.Path, dry_run: bool = Fal
     if not p.stdout:
         return False
 
-    retval = 0
-    if not p.stdout:
-        return False
-
-    json_output = json.loads(p.stdout.decode())
-    if 'status' not in json_output:
-        return False
-
-    final_status = ''
-    if 'conditions' in json_output['status'] and len(json_output['status']['conditions']) > 0:
-        final_status = json_output['status']['conditions'][0]['type']
+    conditions, succeeded, failed = p.stdout.decode().strip().split(',')
+    final_status = conditions.split()[0] if conditions else ''
 
-    if final_status == 'Complete' and 'succeeded' in json_output['status']:
-        retval = json_output['status']['succeeded']
-    elif final_status == 'Failed' and 'failed' in json_output['status']:
-        n = int(json_output['status']['failed'])
+    if final_status == 'Complete' and succeeded:
+        return int(succeeded) == 1
+    if final_status == 'Failed' and failed:
+        n = int(failed)
         logging.error(f'Job {k8s_job_file} failed {n} time(s)')
         # EB-1236, EB-1243: This exception is not caught anywhere - either catch it in caller,
         # or throw UserReportError instead
         raise RuntimeError(f'Job {k8s_job_file} failed {n} time(s)')
-    return int(retval) == 1
+    return False
 
 
 def _ensure_successful_job(k8s_ctx: str, k8s_job_file: pathlib.Path, dry_run: bool = False) -> None:
@@ -354,7 +365,7 @@ def _ensure_successful_job(k8s_ctx: str, k8s_job_file: pathlib.Path, dry_run: bo
         return
 
     p = safe_exec(cmd)
-    status = json.loads(p.stdout.decode())['status']['succeeded']
+    status = json.loads(p.stdout)['status']['succeeded']
     if int(status) != 1:
         raise RuntimeError(f'{k8s_job_file} failed: {p.stderr.decode()}')
 
@@ -381,14 +392,14 @@ def _snapshot_ready(k8s_ctx: str, k8s_spec_file: pathlib.Path, dry_run: bool = F
     if not p.stdout:
         return False
 
-    json_output = json.loads(p.stdout.decode())
-    if 'status' not in json_output or 'readyToUse' not in json_output['status']:
+    ready = (json.loads(p.stdout).get('status') or {}).get('readyToUse')
+    if ready is None:
         return False
 
-    if not isinstance(json_output['status']['readyToUse'], bool):
+    if not isinstance(ready, bool):
         raise UserReportError(returncode=CLUSTER_ERROR, message='Unexpected response when checking PVC snapshot readiness')
 
-    return json_output['status']['readyToUse']
+    return ready
 
 
 def _wait_for_snapshot(k8s_ctx: str, spec_file: pathlib.Path, attempts: int = 30, secs2wait: int = 20, dry_run: bool = False) -> None:
@@ -428,12 +439,12 @@ def _pvc_bound(k8s_ctx: str, pvc_name: str, dry_run: bool = False) -> bool:
     if not p.stdout:
         return False
 
-    json_output = json.loads(p.stdout.decode())
-    if 'status' not in json_output or 'phase' not in json_output['status']:
+    phase = (json.loads(p.stdout).get('status') or {}).get('phase')
+    if phase is None:
         return False
 
-    logging.debug(f"PVC {pvc_name} status: {json_output['status']['phase']}")
-    return json_output['status']['phase'] == 'Bound'
+    logging.debug(f"PVC {pvc_name} status: {phase}")
+    return phase == 'Bound'
 
 
 def wait_for_pvc(k8s_ctx: str, pvc_name: str, attempts: int = 30, secs2wait: int = 20, dry_run: bool = False) -> None:
@@ -481,17 +492,14 @@ def initialize_local_ssd(cfg: ElasticBlastConfig, query_files: List[str] = [], w
             'ELB_IMAGE_QS' : ELB_QS_DOCKER_IMAGE_GCP,
             'TIMEOUT': str(init_blastdb_minutes_timeout*60)
         }
-        with TemporaryDirectory() as d:
-            set_extraction_path(d)
-            job_cloud_split_local_ssd_tmpl = resource_string('elastic_blast', f'templates/{job_template}').decode()
-            job_cloud_split_local_ssd = pathlib.Path(os.path.join(d, 'job-cloud-split-local-ssd.yaml'))
-            with job_cloud_split_local_ssd.open(mode='wt') as f:
-                f.write(substitute_params(job_cloud_split_local_ssd_tmpl, subs))
-            cmd = f"kubectl --context={cfg.appstate.k8s_ctx} apply -f {job_cloud_split_local_ssd}"
-            if dry_run:
-                logging.info(cmd)
-            else:
-                safe_exec(cmd)
+        job_cloud_split_local_ssd_tmpl = resource_string('elastic_blast', f'templates/{job_template}').decode()
+        job_cloud_split_local_ssd = substitute_params(job_cloud_split_local_ssd_tmpl, subs)
+        # the job spec is passed to kubectl through stdin
+        cmd = f"kubectl --context={cfg.appstate.k8s_ctx} apply -f -"
+        if dry_run:
+            logging.info(cmd)
+        else:
+            safe_exec(cmd, stdin=job_cloud_split_local_ssd.encode())
 
     num_nodes = cfg.cluster.num_nodes
     program = cfg.blast.program
@@ -508,7 +516,6 @@ def initialize_local_ssd(cfg: ElasticBlastConfig, query_files: List[str] = [], w
         'ELB_TAX_DB_PATH': taxdb_path,
         'ELB_DB_MOL_TYPE': str(ElbSupportedPrograms().get_db_mol_type(program)),
         'ELB_BLASTDB_SRC': cfg.cluster.db_source.name,
-        'NODE_ORDINAL': '0',
         'ELB_DOCKER_IMAGE': ELB_DOCKER_IMAGE_GCP,
         'K8S_JOB_GET_BLASTDB' : K8S_JOB_GET_BLASTDB,
         'K8S_JOB_LOAD_BLASTDB_INTO_RAM' : K8S_JOB_LOAD_BLASTDB_INTO_RAM,
@@ -520,64 +527,66 @@ def initialize_local_ssd(cfg: ElasticBlastConfig, query_files: List[str] = [], w
         'GCP_PROJECT_OPT' : prj
     }
     logging.debug(f"Initializing local SSD: {ELB_DOCKER_IMAGE_GCP}")
-    with TemporaryDirectory() as d:
-        set_extraction_path(d)
+    start = timer()
+    job_init_local_ssd_tmpl = resource_string('elastic_blast', f'templates/{job_init_template}').decode()
+    # Only the node ordinal differs between the jobs, so the remaining
+    # parameters are substituted once. All job specs are concatenated into
+    # a single multi-document yaml passed to kubectl through stdin.
+    job_init_local_ssd_tmpl = substitute_params(job_init_local_ssd_tmpl, subs)
+    job_init_local_ssd = ''.join([substitute_params(job_init_local_ssd_tmpl, {'NODE_ORDINAL': str(n)}) for n in range(num_nodes)])
+    cmd = f"kubectl --context={cfg.appstate.k8s_ctx} apply -f -"
+    if dry_run:
+        logging.info(cmd)
+    else:
+        safe_exec(cmd, stdin=job_init_local_ssd.encode())
 
-        start = timer()
-        job_init_local_ssd_tmpl = resource_string('elastic_blast', f'templates/{job_init_template}').decode()
-        for n in range(num_nodes):
-            job_init_local_ssd = pathlib.Path(os.path.join(d, f'job-init-local-ssd-{n}.yaml'))
-            subs['NODE_ORDINAL'] = str(n)
-            with job_init_local_ssd.open(mode='wt') as f:
-                f.write(substitute_params(job_init_local_ssd_tmpl, subs))
-        cmd = f"kubectl --context={cfg.appstate.k8s_ctx} apply -f {d}"
+    if wait != ElbExecutionMode.WAIT:
+        return
+
+    # wait for multiple jobs
+    timeout = init_blastdb_minutes_timeout * 60
+    sec2wait = 20
+    while timeout > 0:
+        cmd = f'kubectl --context={cfg.appstate.k8s_ctx} get jobs -o jsonpath=' \
+            '{.items[?(@.status.active)].metadata.name}{\'\\t\'}' \
+            '{.items[?(@.status.failed)].metadata.name}{\'\\t\'}' \
+            '{.items[?(@.status.succeeded)].metadata.name}'
+        if dry_run:
+            logging.info(cmd)
+            res = '\t\t' + \
+                ' '.join([f'init-ssd-{n}' for n in range(num_nodes)])
+        else:
+            proc = safe_exec(cmd)
+            res = proc.stdout.decode()
+            logging.debug(res)
+        active, failed, succeeded = res.split('\t')
+        if failed:
+            try:
+                logs_proc = safe_exec_stream(f'kubectl --context={cfg.appstate.k8s_ctx} logs -l app=setup')
+                with logs_proc:
+                    assert logs_proc.stdout is not None
+                    for line in logs_proc.stdout:
+                        logging.debug(line.rstrip('\n'))
+            except SafeExecError as err:
+                logging.debug(err)
+            raise RuntimeError(f'Local SSD initialization jobs failed: {failed}')
+        if not active:
+            logging.debug(f'Local SSD initialization jobs succeeded: {succeeded}')
+            break
+        time.sleep(sec2wait)
+        timeout -= sec2wait
+    if timeout < 0:
+        raise TimeoutError('Local SSD initialization jobs timed out')
+    end = timer()
+    logging.debug(f'RUNTIME init-storage {end-start} seconds')
+    # Delete setup jobs
+    if not 'ELB_DONT_DELETE_SETUP_JOBS' in os.environ:
+        cmd = f'kubectl --context={cfg.appstate.k8s_ctx} delete jobs -l app=setup'
         if dry_run:
             logging.info(cmd)
         else:
             safe_exec(cmd)
 
-        if wait != ElbExecutionMode.WAIT:
-            return
-
-        # wait for multiple jobs
-        timeout = init_blastdb_minutes_timeout * 60
-        sec2wait = 20
-        while timeout > 0:
-            cmd = f'kubectl --context={cfg.appstate.k8s_ctx} get jobs -o jsonpath=' \
-                '{.items[?(@.status.active)].metadata.name}{\'\\t\'}' \
-                '{.items[?(@.status.failed)].metadata.name}{\'\\t\'}' \
-                '{.items[?(@.status.succeeded)].metadata.name}'
-            if dry_run:
-                logging.info(cmd)
-                res = '\t\t' + \
-                    ' '.join([f'init-ssd-{n}' for n in range(num_nodes)])
-            else:
-                proc = safe_exec(cmd)
-                res = proc.stdout.decode()
-                logging.debug(res)
-            active, failed, succeeded = res.split('\t')
-            if failed:
-                proc = safe_exec(f'kubectl --context={cfg.appstate.k8s_ctx} logs -l app=setup')
-                for line in proc.stdout.decode().split('\n'):
-                    logging.debug(line)
-                raise RuntimeError(f'Local SSD initialization jobs failed: {failed}')
-            if not active:
-                logging.debug(f'Local SSD initialization jobs succeeded: {succeeded}')
-                break
-            time.sleep(sec2wait)
-            timeout -= sec2wait
-        if timeout < 0:
-            raise TimeoutError(f'{d} jobs timed out')
-        end = timer()
-        logging.debug(f'RUNTIME init-storage {end-start} seconds')
-        # Delete setup jobs
-        if not 'ELB_DONT_DELETE_SETUP_JOBS' in os.environ:
-            cmd = f'kubectl --context={cfg.appstate.k8s_ctx} delete jobs -l app=setup'
-            if dry_run:
-                logging.info(cmd)
-            else:
-                safe_exec(cmd)
-
 
 def initialize_persistent_disk(cfg: ElasticBlastConfig, query_files: List[str] = [], wait=ElbExecutionMode.WAIT) -> None:
     """ Initialize Persistent Disk for ElasticBLAST execution
@@ -677,6 +686,9 @@ def initialize_persistent_disk(cfg: ElasticBlastConfig, query_files: List[str] =
             safe_exec(cmd)
 
         start = timer()
+        # Unlike the local SSD jobs, this is a single job, and it is written
+        # to a file rather than piped to kubectl, because _wait_for_job
+        # checks the job status through the file
         job_init_pv = pathlib.Path(os.path.join(d, 'job-init-pv.yaml'))
         with job_init_pv.open(mode='wt') as f:
             f.write(substitute_params(resource_string('elastic_blast', f'templates/{job_init_pv_template}').decode(), subs))
@@ -822,35 +834,33 @@ def get_logs(k8s_ctx: str, label: str, containers: List[str], dry_run: bool = Fa
         containers - list of Kubernetes containers to get logs from
         dry_run - report command only, don't execute it.
     """
-    for c in containers:
-        cmd = f'kubectl --context={k8s_ctx} logs -l {label} -c {c} --timestamps --since=24h --tail=-1'
-        if dry_run:
+    commands = [f'kubectl --context={k8s_ctx} logs -l {label} -c {c} --timestamps --since=24h --tail=-1' for c in containers]
+    if dry_run:
+        for cmd in commands:
             logging.info(cmd)
-        else:
-            try:
-                # kubectl logs command can fail if the pod/container is gone, so we suppress error.
-                #  We can't combine it into one try-except-finally, because safe_exec should report
-                #  the command used in DEBUG level using old format with timestamps. New bare format
-                #  is used only after successful invocation of kubectl logs.
-                proc = safe_exec(cmd)
-                try:
-                    # Temporarily modify format for logging because we import true timestamps
-                    # from Kubernetes and don't need logging timestamps, so we just copy logs
-                    # verbatim.
-                    root_logger = logging.getLogger()
-                    orig_formatter = root_logger.handlers[0].formatter
-                    root_logger.handlers[0].setFormatter(logging.Formatter(fmt='%(message)s'))
-                    for line in proc.stdout.decode().split('\n'):
-                        if line:
-                            logging.info(line)
-                finally:
-                    # Ensure logging is restored to previous format
-                    # type is ignored because orig_formatter can be None
-                    # and there does not seem to be any other way to get
-                    # the original formatter from root logger
-                    root_logger.handlers[0].setFormatter(orig_formatter) # type: ignore
-            except SafeExecError:
-                pass
+        return
+
+    # All kubectl logs commands are started at once, so that their requests
+    # overlap, and their output is streamed line by line in container order
+    # instead of being held in memory.
+    procs = []
+    for cmd in commands:
+        try:
+            procs.append(safe_exec_stream(cmd))
+        except SafeExecError:
+            pass
+
+    for proc in procs:
+        # kubectl logs command can fail if the pod/container is gone, so
+        # its exit status is ignored
+        with proc:
+            assert proc.stdout is not None
+            for line in proc.stdout:
+                line = line.rstrip('\n')
+                if line:
+                    # We import true timestamps from Kubernetes and don't need
+                    # logging timestamps, so we just copy logs verbatim.
+                    logging.info(line, extra={'verbatim': True})
 
 
 def collect_k8s_logs(cfg: ElasticBlastConfig):
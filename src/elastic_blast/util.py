@@ -28,14 +28,16 @@ Created: Tue 07 Apr 2020 03:43:24 PM EDT
 import os
 import re
 import logging
+import logging.handlers
 import argparse
 import subprocess
 import datetime
 import json
 import inspect
-from functools import reduce
+from contextlib import contextmanager
+from functools import lru_cache
 from pkg_resources import resource_exists
-from typing import List, Union, Callable, Optional
+from typing import Iterator, List, Union, Callable, Optional
 from .constants import MolType, GCS_DFLT_BUCKET
 from .constants import DEPENDENCY_ERROR, AWS_MAX_TAG_LENGTH, GCP_MAX_LABEL_LENGTH
 from .constants import AWS_MAX_JOBNAME_LENGTH, CSP, ELB_GCS_PREFIX
@@ -77,57 +79,65 @@ class ElbSupportedPrograms:
 
     Must match https://elbdoc.readthedocs.io/en/latest/configuration.html#blast-program
     """
-    _programs = [
-        'blastp',
-        'blastn',
-        'blastx',
-        'psiblast',
-        'rpsblast',
-        'rpstblastn',
-        'tblastn',
-        'tblastx'
-    ]
+    # expected database and query molecule types for each supported program,
+    # _db_mol_types also defines the list of supported programs
+    _db_mol_types = {
+        'blastp': MolType.PROTEIN,
+        'blastn': MolType.NUCLEOTIDE,
+        'blastx': MolType.PROTEIN,
+        'psiblast': MolType.PROTEIN,
+        'rpsblast': MolType.PROTEIN,
+        'rpstblastn': MolType.PROTEIN,
+        'tblastn': MolType.NUCLEOTIDE,
+        'tblastx': MolType.NUCLEOTIDE
+    }
+    _query_mol_types = {
+        'blastp': MolType.PROTEIN,
+        'blastn': MolType.NUCLEOTIDE,
+        'blastx': MolType.NUCLEOTIDE,
+        'psiblast': MolType.PROTEIN,
+        'rpsblast': MolType.PROTEIN,
+        'rpstblastn': MolType.NUCLEOTIDE,
+        'tblastn': MolType.PROTEIN,
+        'tblastx': MolType.NUCLEOTIDE
+    }
 
     def get(self):
-        return self._programs
+        return list(self._db_mol_types)
 
     def check(self, program):
-        if program not in self._programs:
+        if program not in self._db_mol_types:
             raise ValueError(f"{program} is not a supported BLAST program")
 
     def get_db_mol_type(self, program: str) -> MolType:
         ''' Returns the expected molecule type for the program passed in as an argument.
         '''
-        p = program.lower()
-        if p not in self._programs:
-            raise NotImplementedError(f'Invalid BLAST program "{program}"')
-
-        retval = MolType.UNKNOWN
-        if p == 'blastn' or p == 'tblastn' or p == 'tblastx':
-            retval = MolType.NUCLEOTIDE
-        elif re.search(r'^blast[px]$', p) or re.search(r'^(psi|rps)blast$', p) or p == 'rpstblastn':
-            retval = MolType.PROTEIN
-        else:
-            raise NotImplementedError(f'Invalid BLAST program "{program}"')
-        return retval
-
+        try:
+            return self._db_mol_types[program.lower()]
+        except KeyError:
+            raise NotImplementedError(f'Invalid BLAST program "{program}"') from None
 
     def get_query_mol_type(self, program: str) -> MolType:
         ''' Returns the expected query molecule type for the program passed in
             as an argument.
         '''
-        p = program.lower()
-        if p not in self._programs:
-            raise NotImplementedError(f'Invalid BLAST program "{program}"')
-
-        retval = MolType.UNKNOWN
-        if p in ['blastn', 'blastx', 'tblastx', 'rpstblastn']:
-            retval = MolType.NUCLEOTIDE
-        elif p in ['blastp', 'tblastn', 'psiblast', 'rpsblast']:
-            retval = MolType.PROTEIN
-        else:
-            raise NotImplementedError(f'Invalid BLAST program "{program}"')
-        return retval
+        try:
+            return self._query_mol_types[program.lower()]
+        except KeyError:
+            raise NotImplementedError(f'Invalid BLAST program "{program}"') from None
+
+
+# TODO: should we differentiate between default blast[px] and blast[px]-fast?
+QUERY_BATCH_SIZES = {
+    "blastp":       10000,
+    "blastn":       5000000,
+    "blastx":       20004,
+    "psiblast":     100000,
+    "rpsblast":     100000,
+    "rpstblastn":   100000,
+    "tblastn":      20000,
+    "tblastx":      100000
+}
 
 
 def get_query_batch_size(program: str) -> int:
@@ -145,20 +155,9 @@ def get_query_batch_size(program: str) -> int:
     except ValueError:
         return -1
 
-    # TODO: should we differentiate between default blast[px] and blast[px]-fast?
-    switcher = {
-        "blastp":       10000,
-        "blastn":       5000000,
-        "blastx":       20004,
-        "psiblast":     100000,
-        "rpsblast":     100000,
-        "rpstblastn":   100000,
-        "tblastn":      20000,
-        "tblastx":      100000
-    }
     if 'ELB_BATCH_LEN' in os.environ:
         return int(str(os.getenv('ELB_BATCH_LEN')))
-    return switcher.get(program.lower(), -1)
+    return QUERY_BATCH_SIZES.get(program.lower(), -1)
 
 
 class ElasticBlastBaseException(Exception):
@@ -186,17 +185,19 @@ class SafeExecError(ElasticBlastBaseException):
     pass
 
 
-def safe_exec(cmd: Union[List[str], str]) -> subprocess.CompletedProcess:
+def safe_exec(cmd: Union[List[str], str], stdin: Optional[bytes] = None) -> subprocess.CompletedProcess:
     """Wrapper around subprocess.run that raises SafeExecError on errors from
-    command line with error messages assembled from all available information"""
+    command line with error messages assembled from all available information.
+    If stdin is provided, it is passed to the command's standard input."""
     if isinstance(cmd, str):
         cmd = cmd.split()
     if not isinstance(cmd, list):
         raise ValueError('safe_exec "cmd" argument must be a list or string')
 
     try:
-        logging.debug(' '.join(cmd))
-        p = subprocess.run(cmd, check=True, stdout=subprocess.PIPE,
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug(' '.join(cmd))
+        p = subprocess.run(cmd, check=True, input=stdin, stdout=subprocess.PIPE,
                            stderr=subprocess.PIPE)
     except subprocess.CalledProcessError as e:
         msg = f'The command "{" ".join(e.cmd)}" returned with exit code {e.returncode}\n{e.stderr.decode()}\n{e.stdout.decode()}'
@@ -210,6 +211,29 @@ def safe_exec(cmd: Union[List[str], str]) -> subprocess.CompletedProcess:
     return p
 
 
+def safe_exec_stream(cmd: Union[List[str], str]) -> subprocess.Popen:
+    """Start a command with its standard output available as a text stream,
+    so that long output can be processed line by line as it arrives.
+    The caller is responsible for reading the output and waiting for the
+    process. Undecodable bytes in the output are replaced. Standard error is
+    discarded, so that an unread pipe cannot block the command.
+    Raises SafeExecError if the command cannot be started."""
+    if isinstance(cmd, str):
+        cmd = cmd.split()
+    if not isinstance(cmd, list):
+        raise ValueError('safe_exec_stream "cmd" argument must be a list or string')
+
+    try:
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug(' '.join(cmd))
+        return subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                universal_newlines=True, errors='replace')
+    except PermissionError as e:
+        raise SafeExecError(e.errno, str(e)) from e
+    except FileNotFoundError as e:
+        raise SafeExecError(e.errno, e.strerror) from e
+
+
 def get_blastdb_info(blastdb: str, gcp_prj: Optional[str] = None):
     """Get BLAST database short name, path (if applicable), and label
     for Kubernetes. Gets user provided database from configuration.
@@ -233,9 +257,7 @@ def get_blastdb_info(blastdb: str, gcp_prj: Optional[str] = None):
         output = proc.stdout.decode()
         if not output:
             raise ValueError(f'There are no files at the bucket {db}.*')
-        fnames: List[str] = output.split('\n')
-        res = reduce(lambda x, y: x or y.endswith('tar.gz'), fnames, False)
-        if res:
+        if any(fname.endswith('tar.gz') for fname in output.splitlines()):
             db_path = db + '.tar.gz'
         else:
             db_path = db + '.*'
@@ -266,8 +288,10 @@ def get_blastdb_size(db: str, db_source: DBSource, gcp_prj: Optional[str] = None
     raise NotImplementedError("Not implemented for sources other than GCP")
 
 
+@lru_cache(maxsize=None)
 def gcp_get_blastdb_latest_path(gcp_prj: Optional[str]) -> str:
-    """Get latest path of GCP-based blastdb repository"""
+    """Get latest path of GCP-based blastdb repository. The result is cached,
+    because the path does not change while the application runs."""
     prj = f'-u {gcp_prj}' if gcp_prj else ''
     cmd = f'gsutil {prj} cat {GCS_DFLT_BUCKET}/latest-dir'
     proc = safe_exec(cmd)
@@ -284,7 +308,7 @@ def gcp_get_blastdb_size(db: str, gcp_prj: Optional[str]) -> float:
     prj = f'-u {gcp_prj}' if gcp_prj else ''
     cmd = f'gsutil {prj} cat {latest_path}/blastdb-manifest.json'
     proc = safe_exec(cmd)
-    blastdb_metadata = json.loads(proc.stdout.decode())
+    blastdb_metadata = json.loads(proc.stdout)
     if not db in blastdb_metadata:
         raise ValueError(f'BLAST database {db} was not found')
     return blastdb_metadata[db]['size']
@@ -305,11 +329,18 @@ class K8sTimestampFormatter(logging.Formatter):
     """ Class to support formatting timestamps in a way reported by
     Kubernetes logs.
     Timestamps are in UTC, microseconds can be used in the format string
-    as '%f'. """
+    as '%f'.
+    Records logged with extra={'verbatim': True} are written as the bare
+    message, for log lines copied from Kubernetes with their own timestamps. """
     # To satisfy typecheks we can't reuse converter - so we introduce
     # another one
     my_converter = datetime.datetime.utcfromtimestamp
 
+    def format(self, record):
+        if getattr(record, 'verbatim', False):
+            return record.getMessage()
+        return super().format(record)
+
     def formatTime(self, record, datefmt=None):
         ct = self.my_converter(record.created)
         if datefmt:
@@ -371,6 +402,7 @@ def config_logging(args: argparse.Namespace) -> None:
 
     logging.logThreads = False
     logging.logProcesses = False
+    logging.logMultiprocessing = False
     #logging._srcfile = None
 
     # Hide DEBUG boto logs for now
@@ -378,6 +410,34 @@ def config_logging(args: argparse.Namespace) -> None:
         logging.getLogger(_).setLevel(logging.CRITICAL)
 
 
+@contextmanager
+def buffered_logging(capacity: int = 10000) -> Iterator[None]:
+    """Context manager that buffers log records sent to the root logger's
+    handlers and writes them in bulk, for code that logs a lot in a tight
+    loop. Records are written when the buffer is full, when a WARNING or
+    more severe record is logged, and on exit.
+
+    capacity: maximum number of records to buffer per handler
+    """
+    logger = logging.getLogger()
+    handlers = logger.handlers[:]
+    buffers = []
+    for h in handlers:
+        buffer = logging.handlers.MemoryHandler(capacity, flushLevel=logging.WARNING, target=h)
+        # MemoryHandler.flush bypasses the target's level check, so filter
+        # records at the buffer with the target's level
+        buffer.setLevel(h.level)
+        buffers.append(buffer)
+    logger.handlers = buffers  # type: ignore
+    try:
+        yield
+    finally:
+        logger.handlers = handlers
+        for b in buffers:
+            # flushes buffered records to the target handler
+            b.close()
+
+
 def _str2ll(level: str) -> int:
     """ Converts the log level argument to a numeric value.
 
@@ -400,14 +460,20 @@ class UserReportError(ElasticBlastBaseException):
     pass
 
 
+re_aws_batch_job_name_invalid_chars = re.compile(r'[\W\-]', flags=re.ASCII)
+
+
 def sanitize_for_k8s(input_string: str) -> str:
     """ Changes the input_string so that it is composed of valid characters for a k8s job"""
-    return re.sub(r'_', '-', input_string.lower(), flags=re.ASCII)
+    return input_string.lower().replace('_', '-')
 
 
 def sanitize_aws_batch_job_name(input_name: str) -> str:
     """ Changes the input_name so that it is composed of valid AWS Batch job name characters"""
-    return re.sub(r'[\W\-]', '-', input_name.strip(), flags=re.ASCII)[:AWS_MAX_JOBNAME_LENGTH]
+    return re_aws_batch_job_name_invalid_chars.sub('-', input_name.strip())[:AWS_MAX_JOBNAME_LENGTH]
+
+# Label keys changed to follow NCBI guidelines and AWS conventions
+AWS_TAG_KEYS = {'owner': 'Owner', 'project': 'Project', 'name': 'Name'}
 
 # def convert_labels_to_aws_tags(labels: str) -> List[ {} ]:
 def convert_labels_to_aws_tags(labels: str):
@@ -415,12 +481,9 @@ def convert_labels_to_aws_tags(labels: str):
     resources."""
     retval = []
     for token in labels.split(','):
-        k, v = token.split('=')
-        # Change some keys to follow NCBI guidelines and AWS conventions
-        if k == 'owner': k = 'Owner'
-        if k == 'project': k = 'Project'
-        if k == 'name': k ='Name'
-        retval.append({'Key': k, 'Value': v})
+        # label values may contain '='
+        k, v = token.split('=', 1)
+        retval.append({'Key': AWS_TAG_KEYS.get(k, k), 'Value': v})
     return retval
 
 
@@ -459,6 +522,12 @@ def convert_disk_size_to_gb(size: str) -> int:
         return int(sz)
 
 
+re_gke_cluster_name = re.compile(r'(?:[a-z](?:[-a-z0-9]{0,38}[a-z0-9])?)')
+re_gcp_disk_name = re.compile(r'(?:[a-z](?:[-a-z0-9]{0,61}[a-z0-9])?)')
+re_gcp_string = re.compile(r'^[a-z0-9_\-]+$')
+re_aws_region = re.compile(r'^[A-Za-z0-9\-]+$')
+
+
 def validate_gke_cluster_name(val: str) -> None:
     """Test whether a given string is a legal GKE cluster name
 
@@ -470,7 +539,7 @@ def validate_gke_cluster_name(val: str) -> None:
     # a match of regex '(?:[a-z](?:[-a-z0-9]{0,38}[a-z0-9])?)' (only
     # alphanumerics and '-' allowed, must start with a letter and end with an
     # alphanumeric, and must be no longer than 40 characters).
-    if re.fullmatch(r'(?:[a-z](?:[-a-z0-9]{0,38}[a-z0-9])?)', val) is None:
+    if re_gke_cluster_name.fullmatch(val) is None:
         raise ValueError(f'"{val}" is not a valid GKE cluster name. The string must be less than 40 characters and can only contain lowercase letters, digits, and dashes.')
 
 
@@ -479,7 +548,7 @@ def validate_gcp_disk_name(val: str) -> None:
 
     Raises:
         ValueError id the string is not a legal GCE disk name"""
-    if re.fullmatch(r'(?:[a-z](?:[-a-z0-9]{0,61}[a-z0-9])?)', val) is None:
+    if re_gcp_disk_name.fullmatch(val) is None:
         raise ValueError(f'"{val}" is not a valid GCE disk name. The string must be less than 61 characters long and can only contain lowercase letters, digits, and dashes.')
 
 
@@ -489,7 +558,7 @@ def validate_gcp_string(val: str) -> None:
 
     Raises:
         ValueError if the string is not a legal GCP id"""
-    if re.match(r'^[a-z0-9_\-]+$', val) is None:
+    if re_gcp_string.match(val) is None:
         raise ValueError(f'"{val}" is not a legal GCP id. The string can only contain lowercase letters, digits, underscores, and dashes.')
 
 
@@ -499,14 +568,15 @@ def check_aws_region_for_invalid_characters(val: str) -> None:
 
     Raises:
         ValueError if the string is not a legal AWS region name"""
-    if re.match(r'^[A-Za-z0-9\-]+$', val) is None:
+    if re_aws_region.match(val) is None:
         raise ValueError(f'{val} is not a legal AWS region name. The string can only contain letters, numbers, and dashes.')
 
 
 def clean_up(clean_up_stack: List[Callable]) -> List[str]:
     """Execute a list of cleanup procedures provided as a stack of Callable objects"""
-    logging.debug('Clean up with stack %s',
-                  ', '.join(map(repr, clean_up_stack)))
+    if logging.getLogger().isEnabledFor(logging.DEBUG):
+        logging.debug('Clean up with stack %s',
+                      ', '.join(map(repr, clean_up_stack)))
     messages = []
     while clean_up_stack:
         try:
@@ -545,7 +615,7 @@ def gcp_get_regions() -> List[str]:
     retval = []
     try:
         p = safe_exec(cmd)
-        region_info = json.loads(p.stdout.decode())
+        region_info = json.loads(p.stdout)
         retval = [i['name'] for i in region_info]
     except Exception as err:
         logging.debug(err)
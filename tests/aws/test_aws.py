@@ -62,7 +62,7 @@ from elastic_blast.db_metadata import DbMetadata
 from tests.utils import aws_credentials, gke_mock, MockedStsClient, GKEMock
 
 from botocore.exceptions import ClientError #type: ignore
-from unittest.mock import call, patch, MagicMock
+from unittest.mock import call, patch, MagicMock, PropertyMock
 import pytest
 
 
@@ -551,6 +551,54 @@ def test_report_cloudformation_create_errors(batch, s3, iam, ec2, mocker):
     assert 'Expected error message'
 
 
+def test_stack_status_after_waiter_error():
+    """Test that stack status is taken from the waiter's last response
+    when it is available, and from the stack object otherwise"""
+    from botocore.exceptions import WaiterError
+    eb = MagicMock()
+    eb.cf_stack.stack_status = 'CREATE_COMPLETE'
+    err = WaiterError('StackDeleteComplete', 'test', {'Stacks': [{'StackStatus': 'DELETE_IN_PROGRESS'}]})
+    assert aws.ElasticBlastAws._get_stack_status_after_waiter_error(eb, err) == 'DELETE_IN_PROGRESS'
+    err = WaiterError('StackDeleteComplete', 'test', {'Error': {'Code': 'Throttling'}})
+    assert aws.ElasticBlastAws._get_stack_status_after_waiter_error(eb, err) == 'CREATE_COMPLETE'
+
+
+def test_get_cloudformation_errors_latest_operation(mocker):
+    """Test that only errors from the latest stack operation are reported"""
+    mocker.patch('elastic_blast.aws.ElasticBlastAws._init')
+    eb = aws.ElasticBlastAws.__new__(aws.ElasticBlastAws)
+    eb.stack_name = 'test-stack'
+    eb.cf_stack = MockedCloudformationStack()
+    # stack events are listed newest first
+    events = [MockedCloudformationStackEvent(resource_status='DELETE_FAILED', resource_status_reason='Current error'),
+              MockedCloudformationStackEvent(resource_status='CREATE_FAILED', resource_status_reason='Resource creation cancelled'),
+              MockedCloudformationStackEvent(logical_resource_id='test-stack', resource_status='DELETE_IN_PROGRESS'),
+              MockedCloudformationStackEvent(resource_status='CREATE_FAILED', resource_status_reason='Old error')]
+    eb.cf_stack.events = MockedCloudformationStackEventList(events)
+    assert eb._get_cloudformation_errors('DELETE') == ['SomeResource: Current error']
+
+
+def test_get_cloudformation_errors_create_then_delete(mocker):
+    """Test that stack creation errors are reported when the failed stack
+    creation was followed by a stack deletion"""
+    mocker.patch('elastic_blast.aws.ElasticBlastAws._init')
+    eb = aws.ElasticBlastAws.__new__(aws.ElasticBlastAws)
+    eb.stack_name = 'test-stack'
+    eb.cf_stack = MockedCloudformationStack()
+    # stack events are listed newest first
+    events = [MockedCloudformationStackEvent(logical_resource_id='test-stack', resource_status='DELETE_COMPLETE'),
+              MockedCloudformationStackEvent(resource_status='DELETE_COMPLETE'),
+              MockedCloudformationStackEvent(logical_resource_id='test-stack', resource_status='DELETE_IN_PROGRESS',
+                                             resource_status_reason='The following resource(s) failed to create: [SomeResource]'),
+              MockedCloudformationStackEvent(logical_resource_id='OtherResource', resource_status='CREATE_FAILED',
+                                             resource_status_reason='Resource creation cancelled'),
+              MockedCloudformationStackEvent(resource_status='CREATE_FAILED', resource_status_reason='Creation error'),
+              MockedCloudformationStackEvent(logical_resource_id='test-stack', resource_status='CREATE_IN_PROGRESS'),
+              MockedCloudformationStackEvent(resource_status='CREATE_FAILED', resource_status_reason='Unreachable')]
+    eb.cf_stack.events = MockedCloudformationStackEventList(events)
+    assert eb._get_cloudformation_errors('CREATE') == ['SomeResource: Creation error']
+
+
 @pytest.mark.skipif(True, reason='There seems to be a bug in moto library handling CloudFormation conditions')
 def test_report_cloudformation_delete_errors(ElasticBlastAws, mocker):
     """Test proper reporting of cloudformation stack deletion errors"""
@@ -605,3 +653,177 @@ def test_wrong_provider_user_db():
     assert(exc_info.value.returncode == BLASTDB_ERROR)
     assert('User database ' in exc_info.value.message)
     assert('must reside in AWS S3' in exc_info.value.message)
+
+
+@pytest.fixture
+def ElasticBlastAwsNoInit(aws_credentials, mocker):
+    """Fixture that creates elastic_blast.aws.ElasticBlastAws object without
+    running its AWS initialization, with a mocked AWS Batch client"""
+
+    def mocked_client(name, config = None):
+        """Mocked boto3 client function"""
+        if name == 'sts':
+            return MockedStsClient()
+        return GKEMock().mocked_client(name, config)
+
+    mocker.patch('boto3.client', side_effect=mocked_client)
+    mocker.patch('elastic_blast.elb_config.aws_get_machine_properties', return_value=InstanceProperties(32, 128))
+    mocker.patch('elastic_blast.elb_config.get_db_metadata', return_value=DB_METADATA)
+    mocker.patch('elastic_blast.tuner.aws_get_machine_properties', return_value=InstanceProperties(32, 128))
+    mocker.patch('elastic_blast.tuner.aws_get_machine_type', return_value='test-machine-type')
+    mocker.patch('elastic_blast.aws.ElasticBlastAws._init')
+    cfg = initialize_cfg()
+    eb = aws.ElasticBlastAws(cfg)
+    eb.dry_run = False
+    eb.results_bucket = cfg.cluster.results
+    eb.job_ids = aws.JobIds()
+    eb.job_ids_loaded_at = None
+    eb.batch = MagicMock()
+    yield eb
+
+
+def test_client_submit(ElasticBlastAwsNoInit, mocker):
+    """Test that client_submit submits one AWS Batch job per query batch and
+    records job ids in query batch order"""
+
+    def mocked_submit_job(**kwargs):
+        """Mocked AWS Batch SubmitJob that derives job id from query batch"""
+        return {'jobId': 'id-' + kwargs['parameters']['split-part']}
+
+    eb = ElasticBlastAwsNoInit
+    eb.owner = 'user'
+    eb.db, eb.db_path, eb.db_label = 'test-db', 'None', 'test-db'
+    eb.job_queue_name = 'test-queue'
+    eb.blast_job_definition_name = 'test-job-definition'
+    eb.batch.submit_job.side_effect = mocked_submit_job
+    mocker.patch.object(eb, 'upload_job_ids')
+
+    query_batches = [f's3://test-bucket/batch_{i:03d}.fa' for i in range(25)]
+    eb.client_submit(query_batches, False)
+
+    assert eb.batch.submit_job.call_count == len(query_batches)
+    assert eb.job_ids.search == [f'id-{i}' for i in range(len(query_batches))]
+    submitted = {c.kwargs['jobName']: c.kwargs['parameters']['query-batch'] for c in eb.batch.submit_job.call_args_list}
+    for i, q in enumerate(query_batches):
+        assert submitted[f'elasticblast-user-blastn-batch-test-db-job-{i}'] == q
+    for c in eb.batch.submit_job.call_args_list:
+        env = {e['name']: e['value'] for e in c.kwargs['containerOverrides']['environment']}
+        if env['BLAST_USAGE_REPORT'] == 'true':
+            assert env['BLAST_ELB_BATCH_NUM'] == c.kwargs['parameters']['split-part']
+    eb.upload_job_ids.assert_called_once()
+
+
+def test_client_submit_error(ElasticBlastAwsNoInit, mocker):
+    """Test that client_submit stops submitting jobs after a SubmitJob error
+    and saves ids of the jobs that were submitted"""
+
+    def mocked_submit_job(**kwargs):
+        """Mocked AWS Batch SubmitJob that fails for the fourth query batch"""
+        if kwargs['parameters']['split-part'] == '3':
+            raise ClientError({'Error': {'Code': 'ClientException'}}, 'SubmitJob')
+        return {'jobId': 'id-' + kwargs['parameters']['split-part']}
+
+    eb = ElasticBlastAwsNoInit
+    eb.owner = 'user'
+    eb.db, eb.db_path, eb.db_label = 'test-db', 'None', 'test-db'
+    eb.job_queue_name = 'test-queue'
+    eb.blast_job_definition_name = 'test-job-definition'
+    eb.batch.submit_job.side_effect = mocked_submit_job
+    mocker.patch.object(eb, 'upload_job_ids')
+    mocker.patch('elastic_blast.aws.ELB_AWS_JOB_SUBMISSION_THREADS', 1)
+
+    query_batches = [f's3://test-bucket/batch_{i:03d}.fa' for i in range(1000)]
+    with pytest.raises(UserReportError):
+        eb.client_submit(query_batches, False)
+
+    assert eb.batch.submit_job.call_count < len(query_batches)
+    assert eb.job_ids.search[:3] == ['id-0', 'id-1', 'id-2']
+    assert 'id-3' not in eb.job_ids.search
+    eb.upload_job_ids.assert_called_once()
+
+
+def test_get_blastdb_info_user_db(ElasticBlastAwsNoInit, s3, mocker):
+    """Test that a user database is found next to objects that sort before
+    its files, and that a missing database is reported"""
+    eb = ElasticBlastAwsNoInit
+    mocker.patch.object(aws.ElasticBlastAws, 's3', new_callable=PropertyMock, return_value=s3)
+    bucket = s3.create_bucket(Bucket='test-bucket')
+    for key in ['db/swissprot-old/swissprot.pal', 'db/swissprot-notes.txt', 'db/swissprot.00.psq', 'db/swissprot.pal']:
+        bucket.put_object(Key=key, Body=b'')
+
+    eb.cfg.blast.db = 's3://test-bucket/db/swissprot'
+    assert eb._get_blastdb_info() == ('swissprot', 's3://test-bucket/db', 'swissprot')
+
+    eb.cfg.blast.db = 's3://test-bucket/db/swissprot-old'
+    with pytest.raises(UserReportError) as err:
+        eb._get_blastdb_info()
+    assert err.value.returncode == BLASTDB_ERROR
+
+
+def test_check_status_job_ids_cache(ElasticBlastAwsNoInit, mocker):
+    """Test that a missing job ids metadata file is not re-read from S3 on
+    every status check"""
+
+    eb = ElasticBlastAwsNoInit
+    s3 = MagicMock()
+    s3.Object.return_value.get.side_effect = ClientError({'Error': {'Code': 'NoSuchKey'}}, 'GetObject')
+    mocker.patch.object(aws.ElasticBlastAws, 's3', new_callable=PropertyMock, return_value=s3)
+
+    for _ in range(3):
+        counts, _ = eb._check_status(False)
+        assert sum(counts.values()) == 0
+    s3.Object.return_value.get.assert_called_once()
+    eb.batch.describe_jobs.assert_not_called()
+
+
+def test_check_status_counts(ElasticBlastAwsNoInit):
+    """Test that _check_status counts job states across describe_jobs
+    batches"""
+    STATES = ['SUBMITTED', 'PENDING', 'RUNNABLE', 'STARTING', 'RUNNING', 'SUCCEEDED', 'FAILED']
+
+    def mocked_describe_jobs(jobs):
+        """Mocked AWS Batch DescribeJobs that derives job status from job id"""
+        assert len(jobs) <= 100
+        return {'jobs': [{'jobId': j, 'status': STATES[int(j) % len(STATES)]} for j in jobs]}
+
+    eb = ElasticBlastAwsNoInit
+    NUM_JOBS = 250
+    eb.job_ids = aws.JobIds(search=[str(i) for i in range(NUM_JOBS)])
+    eb.batch.describe_jobs.side_effect = mocked_describe_jobs
+
+    counts, _ = eb._check_status(False)
+    assert eb.batch.describe_jobs.call_count == 3
+    expected = {st: len([i for i in range(NUM_JOBS) if STATES[i % len(STATES)] == st]) for st in STATES}
+    expected_counts = {'pending': expected['SUBMITTED'] + expected['PENDING'] + expected['RUNNABLE'] + expected['STARTING'],
+                       'running': expected['RUNNING'],
+                       'succeeded': expected['SUCCEEDED'],
+                       'failed': expected['FAILED']}
+    assert counts == expected_counts
+
+    # jobs in terminal states are not described again
+    eb.batch.describe_jobs.reset_mock()
+    counts, _ = eb._check_status(False)
+    assert counts == expected_counts
+    described = [j for c in eb.batch.describe_jobs.call_args_list for j in c[1]['jobs']]
+    assert len(described) == NUM_JOBS - expected['SUCCEEDED'] - expected['FAILED']
+    assert all(STATES[int(j) % len(STATES)] not in ('SUCCEEDED', 'FAILED') for j in described)
+
+
+def test_check_status_extended_known_job_ids(ElasticBlastAwsNoInit):
+    """Test that extended status uses describe_jobs rather than listing the
+    job queue when job ids are known"""
+
+    def mocked_describe_jobs(jobs):
+        """Mocked AWS Batch DescribeJobs"""
+        return {'jobs': [{'jobId': j, 'jobName': f'job-{j}', 'status': 'FAILED' if j == '0' else 'SUCCEEDED',
+                          'container': {'exitCode': 1 if j == '0' else 0}} for j in jobs]}
+
+    eb = ElasticBlastAwsNoInit
+    eb.job_ids = aws.JobIds(search=[str(i) for i in range(150)])
+    eb.batch.describe_jobs.side_effect = mocked_describe_jobs
+
+    counts, details = eb._check_status(True)
+    assert counts == {'succeeded': 149, 'failed': 1}
+    assert eb.batch.describe_jobs.call_count == 2
+    eb.batch.get_paginator.assert_not_called()
+    assert 'JobName: job-0\n  ContainerExitCode: 1' in details[aws.STATUS_MESSAGE_VERBOSE]
@@ -24,11 +24,12 @@ Test for elastic_blast.aws_traits
 Author: Greg Boratyn boratyng@ncbi.nlm.nih.gov
 """
 import os
+from unittest.mock import MagicMock, patch
 from elastic_blast.aws_traits import get_machine_properties, create_aws_config, get_availability_zones_for
 from elastic_blast.aws_traits import get_regions
 from elastic_blast.base import InstanceProperties
 from elastic_blast.util import UserReportError
-from elastic_blast.constants import INPUT_ERROR, ELB_DFLT_AWS_REGION
+from elastic_blast.constants import INPUT_ERROR, ELB_DFLT_AWS_REGION, ELB_AWS_MAX_ATTEMPTS
 import pytest
 
 
@@ -37,6 +38,7 @@ def test_create_config():
     config = create_aws_config('some-region')
     assert config
     assert config.region_name == 'some-region'
+    assert config.retries == {'max_attempts': ELB_AWS_MAX_ATTEMPTS, 'mode': 'adaptive'}
 
 
 def test_create_default_config():
@@ -66,6 +68,16 @@ def test_machine_properties():
     assert err.value.returncode == INPUT_ERROR
     assert 'Invalid AWS machine type' in err.value.message
 
+def test_machine_properties_cached():
+    """Test that an instance type is described only once per region"""
+    ec2 = MagicMock()
+    ec2.describe_instance_types.return_value = {'InstanceTypes': [{'VCpuInfo': {'DefaultVCpus': 4}, 'MemoryInfo': {'SizeInMiB': 16384}}]}
+    with patch(target='boto3.client', new=MagicMock(return_value=ec2)):
+        for _ in range(3):
+            props = get_machine_properties('cached-test.xlarge', create_aws_config('test-region'))
+            assert props == InstanceProperties(ncpus=4, memory=16)
+    ec2.describe_instance_types.assert_called_once_with(InstanceTypes=['cached-test.xlarge'])
+
 def test_machine_properties_optimal():
     with pytest.raises(ValueError) as err:
         props = get_machine_properties('optimal')
@@ -29,6 +29,7 @@ from dataclasses import dataclass, field
 import configparser
 from elastic_blast.base import ConfigParserToDataclassMapper, ParamInfo
 from elastic_blast.base import PositiveInteger, Percentage, BoolFromStr, MemoryStr
+from elastic_blast.base import get_field_names
 import pytest
 
 
@@ -128,6 +129,18 @@ def test_configparsertodataclassmapper():
     assert obj.param_3 == EXPECTED_PARAM_3_VALUE
 
 
+def test_get_field_names():
+    """Test that dataclass field names are returned and cached per class"""
+    @dataclass
+    class TestClass:
+        param_1: int = 1
+        param_2: str = field(init=False)
+
+    names = get_field_names(TestClass)
+    assert names == frozenset(['param_1', 'param_2'])
+    assert get_field_names(TestClass) is names
+
+
 def test_bool_param_from_str():
     """Test that boolean config parameters are properly initialized from
     ConfigParser parameters"""
@@ -279,6 +279,16 @@ class ElbConfigLibTester(unittest.TestCase):
         # NB - options are treated as single entity and command line overwrites them all, not merge, not overwrites selectively
         self.assertTrue(cfg.blast.options.strip().find('-task blastp-fast') < 0)
 
+    def test_supported_programs(self):
+        sp = ElbSupportedPrograms()
+        self.assertEqual(sp.get(), ['blastp', 'blastn', 'blastx', 'psiblast', 'rpsblast',
+                                    'rpstblastn', 'tblastn', 'tblastx'])
+        for p in sp.get():
+            sp.check(p)
+            sp.get_query_mol_type(p)
+        with self.assertRaises(ValueError):
+            sp.check('dummy')
+
     def test_db_mol_type(self):
         sp = ElbSupportedPrograms()
         for p in ['BLASTp', 'blastx', 'PSIBLAST', 'rpsBLAST', 'rpstblastn']:
@@ -129,6 +129,9 @@ def test_clouduri():
 
     uri = CloudURI('s3://bucket')
     assert len(uri.md5) 
+    assert uri.compute_md5() == uri.md5
+    # a trailing slash is removed before hashing
+    assert CloudURI('s3://bucket/').md5 == uri.md5
 
 
 def test_gcpstring():
@@ -350,6 +353,18 @@ def test_blastconfig_aws(gke_mock):
     assert cfg.db_mem_margin == ELB_BLASTDB_MEMORY_MARGIN
 
 
+def test_blastconfig_default_outfmt(gke_mock):
+    """Test that the default -outfmt is added only when -outfmt is not given"""
+    for options in ['-outfmt 6', '-evalue 0.01 -outfmt "6 std staxids"']:
+        cfg = BlastConfig(program = 'blastp', db = 'testdb',
+                          queries_arg = 'test-queries', options = options)
+        assert cfg.options == options
+
+    cfg = BlastConfig(program = 'blastp', db = 'testdb',
+                      queries_arg = 'test-queries', options = '-outfmtx 6')
+    assert cfg.options == f'-outfmtx 6 -outfmt {ELB_DFLT_OUTFMT}'
+
+
 def test_blastconfig_validation(gke_mock):
     """Test BlastConfig validation"""
     BAD_URI = 'gs://@BadURI!'
@@ -25,6 +25,7 @@ Author: Greg Boratyn boratyng@ncbi.nlm.nih.gov
 """
 
 import os
+import logging
 import time
 from pathlib import Path
 from tempfile import TemporaryDirectory
@@ -36,6 +37,7 @@ from tests.utils import mocked_safe_exec
 from tests.utils import GKE_PVS, GCP_DISKS, K8S_JOBS, gke_mock, GKEMock
 
 from elastic_blast import kubernetes
+from elastic_blast.util import safe_exec_stream
 from elastic_blast import gcp
 from elastic_blast.config import configure
 from elastic_blast.elb_config import ElasticBlastConfig
@@ -96,8 +98,7 @@ def test_get_persistent_disk_empty(mocker):
     """Test getting k8s cluster persistent disks with no disks"""
     def safe_exec_no_disks(cmd):
         """Mocked safe_exec"""
-        result = {'items': []}
-        return MockedCompletedProcess(json.dumps(result))
+        return MockedCompletedProcess('')
     mocker.patch('elastic_blast.kubernetes.safe_exec', side_effect=safe_exec_no_disks)
 
     disks = kubernetes.get_persistent_disks(K8S_UNINITIALIZED_CONTEXT)
@@ -120,6 +121,23 @@ def test_submit_jobs_bad_path():
             kubernetes.submit_jobs(K8S_UNINITIALIZED_CONTEXT, path)
 
 
+def test_submit_jobs_many_files(mocker):
+    """Test that job files in a large directory are all submitted and job
+    names are reported in job file order"""
+    def mocked_submit_jobs_with_retries(k8s_ctx, path, dry_run):
+        """Mocked job submission that returns job name derived from file name"""
+        return [path.stem]
+    mocker.patch('elastic_blast.kubernetes.submit_jobs_with_retries', side_effect=mocked_submit_jobs_with_retries)
+
+    num_files = kubernetes.K8S_MAX_JOBS_PER_DIR + 50
+    with TemporaryDirectory() as temp:
+        for i in range(num_files):
+            Path(temp, f'batch_{i}.yaml').touch()
+        jobs = kubernetes.submit_jobs(K8S_UNINITIALIZED_CONTEXT, Path(temp))
+    assert jobs == [f'batch_{i}' for i in range(num_files)]
+    assert kubernetes.submit_jobs_with_retries.call_count == num_files
+
+
 FAKE_LABELS = 'cluster-name=fake-cluster'
 
 
@@ -132,10 +150,8 @@ def safe_exec_mock(mocker):
         if isinstance(cmd, list):
             cmd = ' '.join(cmd)
         print(cmd)
-        if 'kubectl ' in cmd and 'get pv -o json' in cmd:
-            result = {'items': []}  # type: ignore
-            result['items'].append({'spec': {'csi': {'volumeHandle': f'/project/test-project/{GCP_DISKS[0]}'}}})  # type: ignore
-            return MockedCompletedProcess(stdout=json.dumps(result))
+        if 'kubectl ' in cmd and 'get pv -o jsonpath' in cmd:
+            return MockedCompletedProcess(stdout=f'/project/test-project/{GCP_DISKS[0]}')
         if 'kubectl ' in cmd and 'get pv' in cmd:
             return MockedCompletedProcess(stdout='CLAIM PDNAME\nblast-dbs-pvc-rwo gke-some-synthetic-name')
         if 'kubectl' in cmd and 'get -f' in cmd:
@@ -148,8 +164,6 @@ def safe_exec_mock(mocker):
         if cmd.startswith('gcloud compute disks update'):
             assert(cmd.startswith(f'gcloud compute disks update gke-some-synthetic-name --update-labels {FAKE_LABELS}'))
             return MockedCompletedProcess()
-        if 'kubectl' in cmd and 'logs' in cmd:
-            return MockedCompletedProcess(stdout='2020-06-18T04:48:33.320344002Z test log entry')
         return GKEMock().mocked_safe_exec(cmd)
 
     # we need kubernetes.safe_exec instead of util.safe exec here, because
@@ -194,8 +208,8 @@ def test_initialize_persistent_disk(gke_mock, safe_exec_mock):
 @patch(target='elastic_blast.kubernetes.label_persistent_disk', new=MagicMock())
 def test_initialize_persistent_disk_failed(gke_mock, safe_exec_mock, mocker):
     def fake_safe_exec_failed_job(cmd):
-        fn = os.path.join(TEST_DATA_DIR, 'job-status-failed.json')
-        return MockedCompletedProcess(stdout=Path(fn).read_text())
+        # job condition types, succeeded and failed counts of a failed job
+        return MockedCompletedProcess(stdout='Failed,,4')
 
     def mocked_get_persistent_disks(k8s_ctx, dry_run):
         """Mocked getting persistent disks ids"""
@@ -228,6 +242,61 @@ def test_label_persistent_disk(safe_exec_mock):
     kubernetes.label_persistent_disk(cfg, 'blast-dbs-pvc-rwo')
 
 
+def test_job_succeeded(mocker):
+    """Test reading job status from kubectl jsonpath output"""
+    job_file = Path(os.path.join(TEST_DATA_DIR, 'job-status.json'))
+    mocker.patch('elastic_blast.kubernetes.safe_exec', return_value=MockedCompletedProcess(stdout='Complete,1,'))
+    assert kubernetes._job_succeeded(K8S_UNINITIALIZED_CONTEXT, job_file)
+    assert 'jsonpath=' in kubernetes.safe_exec.call_args[0][0]
+
+    mocker.patch('elastic_blast.kubernetes.safe_exec', return_value=MockedCompletedProcess(stdout=',,'))
+    assert not kubernetes._job_succeeded(K8S_UNINITIALIZED_CONTEXT, job_file)
+
+    mocker.patch('elastic_blast.kubernetes.safe_exec', return_value=MockedCompletedProcess(stdout='Failed,,4'))
+    with pytest.raises(RuntimeError):
+        kubernetes._job_succeeded(K8S_UNINITIALIZED_CONTEXT, job_file)
+
+
+def test_wait_for_job(mocker):
+    """Test that waiting for a job uses kubectl wait between status checks"""
+    job_file = Path(os.path.join(TEST_DATA_DIR, 'job-status.json'))
+    mocker.patch('elastic_blast.kubernetes._job_succeeded', side_effect=[False, False, True])
+    mocker.patch('elastic_blast.kubernetes.safe_exec',
+                 side_effect=[kubernetes.SafeExecError(1, 'timed out waiting for the condition'),
+                              MockedCompletedProcess()])
+    kubernetes._wait_for_job(K8S_UNINITIALIZED_CONTEXT, job_file, attempts=3, secs2wait=1)
+    assert kubernetes._job_succeeded.call_count == 3
+    assert kubernetes.safe_exec.call_count == 2
+    assert kubernetes.safe_exec.call_args[0][0].startswith(f'kubectl --context={K8S_UNINITIALIZED_CONTEXT} wait --for=condition=complete --timeout=1s -f')
+
+
+def test_wait_for_job_kubectl_error(mocker):
+    """Test that a kubectl wait failure other than a timeout still waits
+    between attempts"""
+    job_file = Path(os.path.join(TEST_DATA_DIR, 'job-status.json'))
+    mocker.patch('elastic_blast.kubernetes._job_succeeded', return_value=False)
+    mocker.patch('elastic_blast.kubernetes.safe_exec',
+                 side_effect=kubernetes.SafeExecError(1, 'error: no matching resources found'))
+    mocker.patch('elastic_blast.kubernetes.time.sleep')
+    with pytest.raises(TimeoutError):
+        kubernetes._wait_for_job(K8S_UNINITIALIZED_CONTEXT, job_file, attempts=3, secs2wait=5)
+    assert kubernetes.safe_exec.call_count == 3
+    assert kubernetes.time.sleep.call_args_list == [((5,),)] * 3
+
+
+def test_wait_for_job_timeout(mocker):
+    """Test that TimeoutError is raised if a job does not finish in the specified number of attempts"""
+    job_file = Path(os.path.join(TEST_DATA_DIR, 'job-status.json'))
+    mocker.patch('elastic_blast.kubernetes._job_succeeded', return_value=False)
+    mocker.patch('elastic_blast.kubernetes.safe_exec',
+                 side_effect=kubernetes.SafeExecError(1, 'timed out waiting for the condition'))
+    mocker.patch('elastic_blast.kubernetes.time.sleep')
+    with pytest.raises(TimeoutError):
+        kubernetes._wait_for_job(K8S_UNINITIALIZED_CONTEXT, job_file, attempts=2, secs2wait=1)
+    assert kubernetes.safe_exec.call_count == 2
+    kubernetes.time.sleep.assert_not_called()
+
+
 def test_delete_all(gke_mock):
     """Test deleteting all jobs, persistent volume claims and persistent volumes"""
     deleted = kubernetes.delete_all(K8S_UNINITIALIZED_CONTEXT)
@@ -257,6 +326,25 @@ def test_get_jobs(gke_mock):
     assert sorted(jobs) == sorted(K8S_JOBS)
 
 
+
+def test_get_logs(mocker, caplog):
+    """Test that container logs are copied verbatim in container order and
+    that containers whose logs cannot be read are skipped"""
+    def fake_safe_exec_stream(cmd):
+        """Mocked safe_exec_stream that prints two log lines for a container"""
+        container = cmd.split(' -c ')[1].split()[0]
+        if container == 'missing':
+            raise kubernetes.SafeExecError(2, 'No such file or directory')
+        return safe_exec_stream(['printf', f'{container} line 1\\n\\n{container} line 2\\n'])
+
+    mocker.patch('elastic_blast.kubernetes.safe_exec_stream', side_effect=fake_safe_exec_stream)
+    with caplog.at_level(logging.INFO):
+        kubernetes.get_logs(K8S_UNINITIALIZED_CONTEXT, 'app=blast', ['first', 'missing', 'second'])
+    assert [r.getMessage() for r in caplog.records] == ['first line 1', 'first line 2',
+                                                        'second line 1', 'second line 2']
+    assert all(r.verbatim for r in caplog.records)
+
+
 # Tests running real kubectl
 
 # A few test require specific GCP credentials and may create GCP resources.
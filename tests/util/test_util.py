@@ -25,6 +25,7 @@ Author: Christiam Camacho (camacho@ncbi.nlm.nih.gov)
 Created: Tue 07 Apr 2020 03:43:24 PM EDT
 """
 import os
+import logging
 import unittest
 from unittest.mock import patch, MagicMock
 import re
@@ -35,6 +36,7 @@ from elastic_blast.constants import ElbCommand, MolType
 from elastic_blast.util import get_query_batch_size
 from elastic_blast.util import convert_memory_to_mb, get_blastdb_size, sanitize_aws_batch_job_name
 from elastic_blast.util import safe_exec, SafeExecError, convert_disk_size_to_gb
+from elastic_blast.util import safe_exec_stream
 from elastic_blast.util import sanitize_for_k8s
 from elastic_blast.util import validate_gcp_string, convert_labels_to_aws_tags
 from elastic_blast.util import validate_gcp_disk_name, gcp_get_regions
@@ -105,6 +107,12 @@ class ElbLibTester(unittest.TestCase):
         self.assertEqual(p.returncode, 0)
         self.assertEqual(p.stdout.decode().rstrip(), text)
 
+    def test_safe_exec_stdin(self):
+        text = 'some cool text'
+        p = safe_exec('cat', stdin=text.encode())
+        self.assertEqual(p.returncode, 0)
+        self.assertEqual(p.stdout.decode(), text)
+
     def test_safe_exec_fail(self):
         """Test that command line returning with non-zero exit status raises
         SafeExecError"""
@@ -126,6 +134,18 @@ class ElbLibTester(unittest.TestCase):
         with self.assertRaises(ValueError) as e:
             safe_exec(1)
 
+    def test_safe_exec_stream(self):
+        """Test that command output can be read line by line"""
+        with safe_exec_stream('printf a\\nb\\n') as p:
+            lines = [line for line in p.stdout]
+        self.assertEqual(p.returncode, 0)
+        self.assertEqual(lines, ['a\n', 'b\n'])
+
+    def test_safe_exec_stream_permission_error(self):
+        """Test that a non-existent binary raises SafeExecError"""
+        with self.assertRaises(SafeExecError):
+            safe_exec_stream(['date -o'])
+
     def test_sanitize_for_k8s(self):
         self.assertEqual('ref-viruses-rep-genomes', sanitize_for_k8s('ref_viruses_rep_genomes'))
         self.assertEqual('betacoronavirus', sanitize_for_k8s('Betacoronavirus'))
@@ -176,7 +196,7 @@ def test_safe_exec_run(mocker):
     mocker.patch('subprocess.run')
     safe_exec(cmd)
     # test subprocess.run is called with check=True
-    subprocess.run.assert_called_with(cmd, check=True, stdout=-1, stderr=-1)
+    subprocess.run.assert_called_with(cmd, check=True, input=None, stdout=-1, stderr=-1)
 
 
 @patch(target='elastic_blast.elb_config.get_db_metadata', new=MagicMock(return_value=DB_METADATA))
@@ -207,6 +227,12 @@ def test_convert_labels_to_aws_tags(gke_mock):
     assert(t['results'] == 's3://some.bucket.with_s0me-interesting-name-end')
 
 
+def test_convert_labels_to_aws_tags_value_with_equal_sign():
+    tags = convert_labels_to_aws_tags('owner=user,results=s3://bucket/a=b')
+    assert tags == [{'Key': 'Owner', 'Value': 'user'},
+                    {'Key': 'results', 'Value': 's3://bucket/a=b'}]
+
+
 def test_disk_size_conversions():
     rv = convert_disk_size_to_gb('100G')
     assert(rv == 100)
@@ -388,3 +414,76 @@ def test_get_blastdb_info(mocker):
     mocker.patch('elastic_blast.util.safe_exec', side_effect=safe_exec_gsutil_ls_exception)
     with pytest.raises(ValueError):
         util.get_blastdb_info(DB, gcp_prj)
+
+
+def test_buffered_logging():
+    """Test that buffered_logging defers log records and restores handlers"""
+
+    class ListHandler(logging.Handler):
+        """Log handler that collects log messages"""
+        def __init__(self):
+            super().__init__()
+            self.messages = []
+        def emit(self, record):
+            self.messages.append(record.getMessage())
+
+    logger = logging.getLogger()
+    handler = ListHandler()
+    logger.addHandler(handler)
+    saved_level = logger.level
+    logger.setLevel(logging.DEBUG)
+    try:
+        with util.buffered_logging():
+            logging.debug('first')
+            assert handler.messages == []
+            logging.warning('second')
+            assert handler.messages == ['first', 'second']
+            logging.debug('third')
+            assert handler.messages == ['first', 'second']
+        assert handler.messages == ['first', 'second', 'third']
+        assert handler in logger.handlers
+    finally:
+        logger.removeHandler(handler)
+        logger.setLevel(saved_level)
+
+
+def test_buffered_logging_handler_level():
+    """Test that buffered_logging honors the level of each handler"""
+
+    class ListHandler(logging.Handler):
+        """Log handler that collects log messages"""
+        def __init__(self, level):
+            super().__init__(level)
+            self.messages = []
+        def emit(self, record):
+            self.messages.append(record.getMessage())
+
+    logger = logging.getLogger()
+    debug_handler = ListHandler(logging.DEBUG)
+    warning_handler = ListHandler(logging.WARNING)
+    logger.addHandler(debug_handler)
+    logger.addHandler(warning_handler)
+    saved_level = logger.level
+    logger.setLevel(logging.DEBUG)
+    try:
+        with util.buffered_logging():
+            logging.debug('debug')
+            logging.info('info')
+            logging.warning('warning')
+            logging.debug('last')
+        assert debug_handler.messages == ['debug', 'info', 'warning', 'last']
+        assert warning_handler.messages == ['warning']
+    finally:
+        logger.removeHandler(debug_handler)
+        logger.removeHandler(warning_handler)
+        logger.setLevel(saved_level)
+
+
+def test_k8s_timestamp_formatter_verbatim():
+    """Test that records marked verbatim are formatted as the bare message"""
+    formatter = util.K8sTimestampFormatter(fmt='%(asctime)s %(levelname)s: %(message)s')
+    record = logging.LogRecord('test', logging.INFO, __file__, 1, 'some message', None, None)
+    assert formatter.format(record).endswith('INFO: some message')
+    assert formatter.format(record) != 'some message'
+    record.verbatim = True
+    assert formatter.format(record) == 'some message'
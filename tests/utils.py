@@ -141,6 +141,13 @@ class MockedCompletedProcess:
         self.storage = storage
         self.key = key
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Simulate subprocess.Popen used as a context manager"""
+        pass
+
     def communicate(self, arg):
         """Simulate writing subprocess stdin to a cloud storage object.
         This function is used in elastic_blast.fileheloper.check_dir_for_write
@@ -318,18 +325,12 @@ def mocked_safe_exec(cmd: Union[List[str], str], cloud_state: CloudResources = N
         return MockedCompletedProcess()
 
     # get persistent disks
-    elif cmd[0] == 'kubectl' and 'get pv -o json' in ' '.join(cmd):
-        result = {'items': []}  # type: ignore
-        for i in GCP_DISKS:
-            result['items'].append({'spec': {'csi': {'volumeHandle': f'/test-project/test-region/{i}'}}})  # type: ignore
-        return MockedCompletedProcess(json.dumps(result))
+    elif cmd[0] == 'kubectl' and 'get pv -o jsonpath={.items[*].spec.csi.volumeHandle}' in ' '.join(cmd):
+        return MockedCompletedProcess(' '.join([f'/test-project/test-region/{i}' for i in GCP_DISKS]))
 
     # get kubernetes jobs
-    elif cmd[0] == 'kubectl' and 'get jobs -o json' in ' '.join(cmd):
-        result = {'items': []}
-        for i in K8S_JOBS:
-            result['items'].append({'metadata': {'name': i}})
-        return MockedCompletedProcess(json.dumps(result))
+    elif cmd[0] == 'kubectl' and 'get jobs -o jsonpath={.items[*].metadata.name}' in ' '.join(cmd):
+        return MockedCompletedProcess(' '.join(K8S_JOBS))
 
     elif cmd[0] == 'kubectl' and 'get pv,pvc -o=NAME' in ' '.join(cmd):
         return MockedCompletedProcess('persistentvolume/pvc-3aafea07-4d87-4349-bcfa-fce4cf8c0197')
@@ -500,9 +501,13 @@ class GKEMock:
         return mocked_safe_exec(cmd, self.cloud)
 
 
-    def mocked_popen(self, cmd, stderr, stdin=None, stdout=None, universal_newlines=True):
+    def mocked_popen(self, cmd, stderr, stdin=None, stdout=None, universal_newlines=True, errors=None):
         """Mocked subprocess.Popen function, used to mock calls to gsutil used
-            in elastic_blast.filehelper"""
+            in elastic_blast.filehelper and kubectl logs used in
+            elastic_blast.kubernetes"""
+        # get_logs
+        if cmd[0] == 'kubectl' and 'logs' in cmd:
+            return MockedCompletedProcess(stdout='2020-06-18T04:48:33.320344002Z test log entry\n', subprocess_run_called=False)
         # open_for_read
         if ' '.join(cmd).startswith('gsutil') and 'cat' in cmd:
             if cmd[-1] in self.cloud.storage:
@@ -541,6 +546,8 @@ class GKEMock:
             return MockedStsClient()
         elif client == 'ec2':
             return MockedEC2Client()
+        elif client == 'cloudformation':
+            return MockedCloudformationClient()
         else:
             raise NotImplementedError(f'boto3 mock for {client} client is not implemented')
 
@@ -692,6 +699,16 @@ class MockedCloudformationStack:
         raise ClientError
 
 
+class MockedCloudformationClient:
+    """Mocked boto3 cloudformation client"""
+    def describe_stacks(self, StackName):
+        """Always raise an exception to indicate that there is no stack named
+            StackName"""
+        raise ClientError({'Error': {'Code': 'ValidationError',
+                                     'Message': f'Stack with id {StackName} does not exist'}},
+                          'DescribeStacks')
+
+
 class MockedCloudformationResource:
     """Mocked boto3 cloudformation resource"""
     def Stack(self, name):